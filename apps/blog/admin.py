@@ -1,5 +1,14 @@
-from django.contrib import admin
-from .models import Post, Category, Tag, Comment
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html_join
+from django.views.decorators.http import require_POST
+from .models import Post, Category, Tag, Comment, PostRevision
+from .readers import daily_readers
+from .revisions import diff_table, ensure_initial_revision, record_revision, restore_revision, revision_state
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -15,13 +24,13 @@ class TagAdmin(admin.ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ['title', 'author', 'category', 'status', 'is_featured', 'views', 'published_date']
+    list_display = ['title', 'author', 'category', 'status', 'is_featured', 'views', 'readers', 'published_date']
     list_filter = ['status', 'is_featured', 'category', 'created_date', 'published_date']
     search_fields = ['title', 'content', 'excerpt']
     prepopulated_fields = {'slug': ('title',)}
     filter_horizontal = ['tags']
     list_editable = ['status', 'is_featured']
-    readonly_fields = ['views', 'created_date', 'updated_date']
+    readonly_fields = ['views', 'readers', 'daily_readers', 'word_count', 'reading_minutes', 'created_date', 'updated_date']
     date_hierarchy = 'published_date'
     
     fieldsets = (
@@ -29,21 +38,93 @@ class PostAdmin(admin.ModelAdmin):
             'fields': ('title', 'slug', 'author', 'category')
         }),
         ('Content', {
-            'fields': ('content', 'excerpt', 'featured_image')
+            'fields': ('content', 'content_format', 'excerpt', 'featured_image')
         }),
         ('Classification', {
             'fields': ('tags', 'status', 'is_featured')
         }),
         ('Metadata', {
-            'fields': ('views', 'created_date', 'updated_date', 'published_date'),
+            'fields': ('views', 'readers', 'daily_readers', 'word_count', 'reading_minutes', 'created_date', 'updated_date', 'published_date'),
             'classes': ('collapse',)
         }),
     )
     
+    @admin.display(description='Readers per day (last 7 days)')
+    def daily_readers(self, obj):
+        if not obj.pk:
+            return '-'
+        return format_html_join(
+            ', ', '{}: ~{}', ((day.strftime('%b %d'), count) for day, count in daily_readers(obj.pk))
+        )
+    
     def save_model(self, request, obj, form, change):
         if not obj.pk:
             obj.author = request.user
+        if change:
+            ensure_initial_revision(obj)
         super().save_model(request, obj, form, change)
+        record_revision(obj, request.user)
+    
+    def get_urls(self):
+        return [
+            path('<int:object_id>/revisions/', self.admin_site.admin_view(self.revision_list),
+                 name='blog_post_revisions'),
+            path('<int:object_id>/revisions/<int:number>/', self.admin_site.admin_view(self.revision_diff),
+                 name='blog_post_revision_diff'),
+            path('<int:object_id>/revisions/<int:number>/restore/',
+                 self.admin_site.admin_view(require_POST(self.revision_restore)),
+                 name='blog_post_revision_restore'),
+        ] + super().get_urls()
+    
+    def _revision_post(self, request, object_id):
+        post = get_object_or_404(Post, pk=object_id)
+        if not self.has_view_permission(request, post):
+            raise PermissionDenied
+        return post
+    
+    def revision_list(self, request, object_id):
+        """All revisions of a post, newest first"""
+        post = self._revision_post(request, object_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'original': post,
+            'title': f'Revisions of "{post.title}"',
+            'revisions': post.revisions.select_related('author').defer('data'),
+        }
+        return TemplateResponse(request, 'admin/blog/post/revision_list.html', context)
+    
+    def revision_diff(self, request, object_id, number):
+        """Changes made by a revision, or against ?against=<number>"""
+        post = self._revision_post(request, object_id)
+        try:
+            new = revision_state(post.pk, number)
+            against = int(request.GET.get('against', number - 1))
+            old = revision_state(post.pk, against) if against >= 1 else dict.fromkeys(new, '')
+        except (PostRevision.DoesNotExist, ValueError):
+            raise Http404('No such revision')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'original': post,
+            'title': f'Revision {number} of "{post.title}"',
+            'number': number,
+            'against': against,
+            'tables': diff_table(old, new, f'Revision {against}' if against >= 1 else 'Empty', f'Revision {number}'),
+            'can_restore': self.has_change_permission(request, post),
+        }
+        return TemplateResponse(request, 'admin/blog/post/revision_diff.html', context)
+    
+    def revision_restore(self, request, object_id, number):
+        post = self._revision_post(request, object_id)
+        if not self.has_change_permission(request, post):
+            raise PermissionDenied
+        try:
+            restore_revision(post, number, request.user)
+        except PostRevision.DoesNotExist:
+            raise Http404('No such revision')
+        messages.success(request, f'Restored revision {number} of "{post.title}".')
+        return redirect(reverse('admin:blog_post_change', args=[post.pk]))
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -0,0 +1,227 @@
+import time
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from my_portfolio.syndication import bump_generation, cached_document, generation
+
+from .comments import approved, parse_cursor
+from .models import Post, Comment
+from .pagination import keyset_page
+from .sidebar import get_sidebar
+
+API_VERSION = 'v1'
+GENERATION_KEY = 'blog:api:generation'
+# Payloads also carry view and reader counts, which change without signals, so
+# the version also moves to a new time bucket this often
+PAYLOAD_TIMEOUT = 60 * 5
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Query parameters any endpoint reads; others are ignored and not cached apart
+QUERY_PARAMS = ('fields', 'limit', 'cursor', 'category', 'tag')
+
+
+class FieldError(ValueError):
+    pass
+
+
+def absolute_url(location):
+    """URL on SITE_URL rather than the request's host, as payloads are shared in the cache"""
+    return urljoin(settings.SITE_URL, location)
+
+
+def _image_url(request, field_file):
+    return absolute_url(field_file.url) if field_file else None
+
+
+# name: (columns to load, value getter)
+POST_FIELDS = {
+    'id': (['id'], lambda request, post: post.id),
+    'slug': (['slug'], lambda request, post: post.slug),
+    'title': (['title'], lambda request, post: post.title),
+    'url': (['slug'], lambda request, post: absolute_url(post.get_absolute_url())),
+    'excerpt': (['excerpt'], lambda request, post: post.excerpt),
+    'content': (['content'], lambda request, post: post.content),
+    'content_format': (['content_format'], lambda request, post: post.content_format),
+    'content_html': (['content_html'], lambda request, post: post.content_html),
+    'author': (['author__username'], lambda request, post: post.author.username),
+    'category': (
+        ['category__name', 'category__slug'],
+        lambda request, post: {'name': post.category.name, 'slug': post.category.slug} if post.category else None,
+    ),
+    'tags': ([], lambda request, post: [{'name': tag.name, 'slug': tag.slug} for tag in post.tags.all()]),
+    'featured_image': (['featured_image'], lambda request, post: _image_url(request, post.featured_image)),
+    'published_date': (['published_date'], lambda request, post: post.published_date),
+    'updated_date': (['updated_date'], lambda request, post: post.updated_date),
+    'word_count': (['word_count'], lambda request, post: post.word_count),
+    'reading_minutes': (['reading_minutes'], lambda request, post: post.reading_minutes),
+    'views': (['views'], lambda request, post: post.views),
+    'readers': (['readers'], lambda request, post: post.readers),
+}
+LIST_FIELDS = [
+    'id', 'slug', 'title', 'url', 'excerpt', 'author', 'category', 'tags',
+    'published_date', 'reading_minutes',
+]
+
+COMMENT_FIELDS = {
+    'id': lambda comment: comment.id,
+    'parent': lambda comment: comment.parent_id,
+    'author': lambda comment: comment.author.username,
+    'content': lambda comment: comment.content,
+    'created_date': lambda comment: comment.created_date,
+    'reply_count': lambda comment: comment.reply_count,
+}
+
+
+def content_generation():
+    """Counter bumped whenever blog content changes; part of every API ETag"""
+    return generation(GENERATION_KEY)
+
+
+def bump_content_generation():
+    bump_generation(GENERATION_KEY)
+
+
+def api_version(request, slug=None, **kwargs):
+    """Content generation plus a PAYLOAD_TIMEOUT time bucket, so counts are revalidated too"""
+    if slug is not None:
+        get_object_or_404(Post.objects.filter(status='published').only('id'), slug=slug)
+    bucket = int(time.time()) // PAYLOAD_TIMEOUT
+    return None, f'{API_VERSION}-{content_generation()}-{bucket}'
+
+
+def api_view(view):
+    """GET-only, cached, ETag-validated JSON endpoint"""
+    return require_GET(cached_document(api_version, timeout=PAYLOAD_TIMEOUT, params=QUERY_PARAMS)(view))
+
+
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def requested_fields(request, allowed, default):
+    """Fields named in ?fields=a,b,c (all allowed ones for ?fields=*), else default"""
+    value = request.GET.get('fields')
+    if not value:
+        return list(default)
+    if value == '*':
+        return list(allowed)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise FieldError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def requested_limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def post_queryset(fields):
+    """Published posts loading only the columns the requested fields need"""
+    columns = {'id', 'slug', 'published_date'}
+    for name in fields:
+        columns.update(POST_FIELDS[name][0])
+    posts = Post.objects.filter(status='published')
+    if 'author' in fields:
+        posts = posts.select_related('author')
+    if 'category' in fields:
+        posts = posts.select_related('category')
+    if 'tags' in fields:
+        posts = posts.prefetch_related('tags')
+    return posts.only(*columns)
+
+
+def serialize_post(request, post, fields):
+    return {name: POST_FIELDS[name][1](request, post) for name in fields}
+
+
+def page_url(request, **params):
+    query = request.GET.copy()
+    for key in set(query) - set(QUERY_PARAMS):
+        del query[key]
+    for key, value in params.items():
+        query[key] = value
+    return absolute_url(f'{request.path}?{query.urlencode()}')
+
+
+@api_view
+def post_list(request):
+    """Published posts, newest first, cursor-paginated"""
+    try:
+        fields = requested_fields(request, POST_FIELDS, LIST_FIELDS)
+    except FieldError as exc:
+        return error(str(exc))
+
+    posts = post_queryset(fields)
+    if request.GET.get('category'):
+        posts = posts.filter(category__slug=request.GET['category'])
+    if request.GET.get('tag'):
+        posts = posts.filter(tags__slug=request.GET['tag'])
+
+    page = keyset_page(posts, after=request.GET.get('cursor'), per_page=requested_limit(request))
+    return JsonResponse({
+        'results': [serialize_post(request, post, fields) for post in page],
+        'next': page_url(request, cursor=page.next_cursor) if page.next_cursor else None,
+    })
+
+
+@api_view
+def post_detail(request, slug):
+    try:
+        fields = requested_fields(request, POST_FIELDS, POST_FIELDS)
+    except FieldError as exc:
+        return error(str(exc))
+    post = get_object_or_404(post_queryset(fields), slug=slug)
+    return JsonResponse(serialize_post(request, post, fields))
+
+
+@api_view
+def post_comments(request, slug):
+    """Approved comments of a post in posting order, flat with parent ids"""
+    try:
+        fields = requested_fields(request, COMMENT_FIELDS, COMMENT_FIELDS)
+    except FieldError as exc:
+        return error(str(exc))
+    post = get_object_or_404(Post.objects.filter(status='published').only('id'), slug=slug)
+
+    comments = approved(Comment.objects.filter(post=post))
+    after = parse_cursor(request.GET.get('cursor'))
+    if after:
+        comments = comments.filter(id__gt=after)
+    limit = requested_limit(request)
+    rows = list(comments.order_by('id')[:limit + 1])
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+
+    return JsonResponse({
+        'results': [
+            {name: COMMENT_FIELDS[name](comment) for name in fields}
+            for comment in rows[:limit]
+        ],
+        'next': page_url(request, cursor=next_cursor) if next_cursor else None,
+    })
+
+
+@api_view
+def category_list(request):
+    """Categories with their published post counts, from the cached sidebar"""
+    return JsonResponse({'results': [
+        {'name': category.name, 'slug': category.slug, 'description': category.description,
+         'post_count': category.post_count}
+        for category in get_sidebar()['categories']
+    ]})
+
+
+@api_view
+def tag_list(request):
+    return JsonResponse({'results': [
+        {'name': tag.name, 'slug': tag.slug, 'post_count': tag.post_count}
+        for tag in get_sidebar()['tags']
+    ]})
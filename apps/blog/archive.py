@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post, ArchiveMonth
+
+
+def month_of(published_date):
+    """(year, month) of a publication date in the site's time zone"""
+    local = timezone.localtime(published_date)
+    return local.year, local.month
+
+
+def month_bounds(year, month):
+    """Aware [start, end) datetimes of a month, for index-friendly range filters"""
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = timezone.make_aware(datetime(year + month // 12, month % 12 + 1, 1))
+    return start, end
+
+
+def posts_in_month(posts, year, month):
+    start, end = month_bounds(year, month)
+    return posts.filter(published_date__gte=start, published_date__lt=end)
+
+
+def archive_month_of(post):
+    """The archive month a post counts towards, or None if it is not published"""
+    if post.status == 'published' and post.published_date:
+        return month_of(post.published_date)
+    return None
+
+
+def recount_months(months):
+    """Recount published posts in the given (year, month) pairs.
+
+    One range COUNT per month; empty months are removed from the rollup.
+    """
+    months = {month for month in months if month}
+    with transaction.atomic():
+        for year, month in months:
+            count = posts_in_month(Post.objects.filter(status='published'), year, month).count()
+            if count:
+                ArchiveMonth.objects.update_or_create(
+                    year=year, month=month, defaults={'post_count': count},
+                )
+            else:
+                ArchiveMonth.objects.filter(year=year, month=month).delete()
+    return len(months)
+
+
+def rebuild_archive():
+    """Rebuild the whole rollup from the published dates"""
+    counts = {}
+    for published_date in Post.objects.filter(
+        status='published', published_date__isnull=False
+    ).values_list('published_date', flat=True).iterator():
+        key = month_of(published_date)
+        counts[key] = counts.get(key, 0) + 1
+
+    with transaction.atomic():
+        ArchiveMonth.objects.all().delete()
+        ArchiveMonth.objects.bulk_create([
+            ArchiveMonth(year=year, month=month, post_count=count)
+            for (year, month), count in counts.items()
+        ])
+    return len(counts)
+
+
+def archive_years(months):
+    """Group rollup rows into [(year, total, [months])], newest first"""
+    years = {}
+    for item in months:
+        years.setdefault(item.year, []).append(item)
+    return [
+        (year, sum(item.post_count for item in items), items)
+        for year, items in sorted(years.items(), reverse=True)
+    ]
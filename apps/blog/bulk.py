@@ -0,0 +1,200 @@
+import json
+import re
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from .api import bump_content_generation
+from .archive import archive_month_of, recount_months
+from .models import Post, Category, Tag
+from .related import schedule_update
+from .rendering import render_post
+from .search import update_search_vector
+from .sidebar import invalidate_sidebar
+
+# Fields written by export_posts and read by import_posts, besides relations
+POST_FIELDS = [
+    'title', 'slug', 'content', 'content_format', 'excerpt', 'status',
+    'is_featured', 'created_date', 'published_date',
+]
+DATE_FIELDS = ['created_date', 'published_date']
+
+
+def resolve_by_name(model, names):
+    """Return {name: instance} for names, creating missing ones in one INSERT.
+
+    New names get free slugs, so "C++" is still created when "C" exists.
+    """
+    names = {name.strip() for name in names if name and name.strip()}
+    if not names:
+        return {}
+    found = {obj.name: obj for obj in model.objects.filter(name__in=names)}
+    missing = sorted(names - set(found))
+    if missing:
+        bases = [slugify(name) or model._meta.model_name for name in missing]
+        model.objects.bulk_create(
+            [model(name=name, slug=slug) for name, slug in zip(missing, allocate_slugs(bases, model=model))],
+            # Only a concurrent insert of the same name can still conflict
+            ignore_conflicts=True,
+        )
+        found.update({obj.name: obj for obj in model.objects.filter(name__in=missing)})
+    return found
+
+
+def allocate_slugs(bases, exclude_id=None, model=Post):
+    """Return a free slug of model for each base slug, using one query for all of them.
+
+    Duplicates within bases get distinct slugs ("django", "django-1", ...).
+    Only the base itself and its numbered variants are loaded, not every slug
+    sharing a prefix.
+    """
+    if not bases:
+        return []
+    # Room for a "-NNN" suffix within the column
+    max_length = model._meta.get_field('slug').max_length - 4
+    bases = [base[:max_length] for base in bases]
+    condition = Q(pk__in=[])
+    for base in set(bases):
+        condition |= Q(slug=base) | Q(slug__startswith=f'{base}-', slug__regex=rf'^{re.escape(base)}-[0-9]+$')
+    taken = model.objects.filter(condition)
+    if exclude_id is not None:
+        taken = taken.exclude(id=exclude_id)
+    taken = set(taken.values_list('slug', flat=True))
+
+    slugs = []
+    for base in bases:
+        slug, counter = base, 1
+        while slug in taken:
+            slug = f'{base}-{counter}'
+            counter += 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def post_to_record(post):
+    """Serialize a post (with author, category and tags loaded) to a dict"""
+    record = {field: getattr(post, field) for field in POST_FIELDS}
+    for field in DATE_FIELDS:
+        record[field] = record[field].isoformat() if record[field] else None
+    record['author'] = post.author.username
+    record['category'] = post.category.name if post.category else None
+    record['tags'] = [tag.name for tag in post.tags.all()]
+    return record
+
+
+def export_queryset():
+    return (
+        Post.objects.select_related('author', 'category')
+        .prefetch_related('tags')
+        .order_by('id')
+    )
+
+
+def iter_records(chunk_size=500):
+    for post in export_queryset().iterator(chunk_size=chunk_size):
+        yield post_to_record(post)
+
+
+def dump_front_matter(record):
+    """Markdown document with the record's metadata as front matter.
+
+    Values are JSON encoded, which is also valid YAML, so files stay readable
+    by static-site generators without needing a YAML parser here.
+    """
+    lines = ['---']
+    for key, value in record.items():
+        if key != 'content':
+            lines.append(f'{key}: {json.dumps(value, ensure_ascii=False)}')
+    lines.append('---')
+    lines.append('')
+    return '\n'.join(lines) + record.get('content', '')
+
+
+def load_front_matter(text):
+    """Inverse of dump_front_matter; plain "key: value" lines are also accepted"""
+    record = {}
+    if text.startswith('---'):
+        header, _, body = text[3:].lstrip('\n').partition('\n---\n')
+        for line in header.splitlines():
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+            value = value.strip()
+            try:
+                record[key.strip()] = json.loads(value)
+            except ValueError:
+                record[key.strip()] = value.strip('"\'')
+        text = body.lstrip('\n')
+    record['content'] = text
+    return record
+
+
+def _build_post(record, authors, categories, default_author):
+    post = Post(**{
+        field: record[field] for field in POST_FIELDS
+        if record.get(field) not in (None, '') and field != 'slug'
+    })
+    for field in DATE_FIELDS:
+        value = getattr(post, field)
+        if isinstance(value, str):
+            setattr(post, field, parse_datetime(value))
+    post.created_date = post.created_date or timezone.now()
+    if post.status == 'published' and not post.published_date:
+        post.published_date = timezone.now()
+    post.author = authors.get(record.get('author')) or default_author
+    post.category = categories.get((record.get('category') or '').strip())
+    render_post(post)
+    return post
+
+
+def import_batch(records, default_author, skip_existing=False):
+    """Create posts from records in a constant number of queries.
+
+    Authors, categories and tags are resolved by name with IN queries and
+    bulk inserts, slugs are allocated from a single lookup, and posts and
+    their tag links are written with bulk_create. Returns the created posts.
+    Raises ValueError, before writing anything, if a record has an unknown status.
+    """
+    statuses = {value for value, _ in Post.STATUS_CHOICES}
+    for record in records:
+        if record.get('status') not in (None, '', *statuses):
+            raise ValueError(f"Unknown status {record['status']!r} for post {record.get('title')!r}.")
+    if skip_existing:
+        given = [record['slug'] for record in records if record.get('slug')]
+        existing = set(Post.objects.filter(slug__in=given).values_list('slug', flat=True))
+        records = [record for record in records if record.get('slug') not in existing]
+    if not records:
+        return []
+
+    usernames = {record.get('author') for record in records if record.get('author')}
+    authors = {user.username: user for user in User.objects.filter(username__in=usernames)}
+
+    with transaction.atomic():
+        categories = resolve_by_name(Category, [record.get('category') for record in records])
+        tags = resolve_by_name(Tag, [name for record in records for name in record.get('tags') or []])
+
+        posts = [_build_post(record, authors, categories, default_author) for record in records]
+        bases = [slugify(record.get('slug') or record['title']) or 'post' for record in records]
+        for post, slug in zip(posts, allocate_slugs(bases)):
+            post.slug = slug
+
+        posts = Post.objects.bulk_create(posts)
+        Post.tags.through.objects.bulk_create([
+            Post.tags.through(post_id=post.id, tag_id=tags[name.strip()].id)
+            for post, record in zip(posts, records)
+            for name in set(record.get('tags') or [])
+            if name.strip() in tags
+        ], ignore_conflicts=True)
+
+    # bulk_create skips Post.save and post_save, so refresh derived data here
+    update_search_vector([post.id for post in posts])
+    schedule_update([post.id for post in posts])
+    recount_months({archive_month_of(post) for post in posts})
+    invalidate_sidebar()
+    bump_content_generation()
+    return posts
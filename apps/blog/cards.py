@@ -0,0 +1,68 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+CARD_KEY = 'blog:card:{}:{}:{}:{}:{}'
+CARD_GENERATION_KEY = 'blog:card:generation'
+CARD_TIMEOUT = 60 * 60 * 24
+# Stands in for the view count, which changes without touching updated_date
+VIEWS_MARK = '\x1eviews\x1e'
+
+
+def card_generation():
+    """Counter bumped when categories, tags or authors change, as cards show their names"""
+    generation = cache.get(CARD_GENERATION_KEY)
+    if generation is None:
+        cache.add(CARD_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(CARD_GENERATION_KEY)
+    return generation
+
+
+def bump_card_generation():
+    try:
+        cache.incr(CARD_GENERATION_KEY)
+    except ValueError:
+        cache.set(CARD_GENERATION_KEY, time.time_ns(), None)
+
+
+def card_key(template_name, post, generation):
+    # Variants are stored after the save without touching updated_date
+    variants_source = (post.featured_image_variants or {}).get('source', '')
+    return CARD_KEY.format(template_name, generation, post.id, post.updated_date.timestamp(), variants_source)
+
+
+def render_cards(posts, template_name, prefetch=('tags',)):
+    """Set post.card_html on each post, rendering only cards missing from the cache.
+
+    Cards are keyed on (post.id, post.updated_date) and fetched with one
+    get_many per page; relations in prefetch are loaded for the misses only.
+    Posts with a search headline are rendered every time, as it depends on
+    the query.
+    """
+    posts = list(posts)
+    generation = card_generation()
+    keys = {post.id: card_key(template_name, post, generation) for post in posts}
+    cached = cache.get_many(list(keys.values()))
+
+    missing = [
+        post for post in posts
+        if keys[post.id] not in cached or getattr(post, 'headline', None)
+    ]
+    if missing and prefetch:
+        prefetch_related_objects(missing, *prefetch)
+
+    rendered = {}
+    for post in missing:
+        html = render_to_string(template_name, {'post': post, 'views': VIEWS_MARK})
+        if not getattr(post, 'headline', None):
+            rendered[keys[post.id]] = html
+        cached[keys[post.id]] = html
+    if rendered:
+        cache.set_many(rendered, CARD_TIMEOUT)
+
+    for post in posts:
+        post.card_html = mark_safe(cached[keys[post.id]].replace(VIEWS_MARK, str(post.views)))
+    return posts
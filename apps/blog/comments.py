@@ -0,0 +1,76 @@
+from django.db.models import Count, Q
+
+from .models import Comment
+
+# Top-level comments (or direct replies) per page
+COMMENTS_PER_PAGE = 10
+# Most comments rendered by one request, replies included
+COMMENT_BUDGET = 50
+# Reply levels loaded per request; deeper threads load on demand
+MAX_DEPTH = 3
+
+
+class CommentPage:
+    """One page of comments with replies attached as comment.children"""
+
+    def __init__(self, comments, next_cursor=None):
+        self.comments = comments
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.comments)
+
+    def __len__(self):
+        return len(self.comments)
+
+
+def approved(comments):
+    """Approved comments with their author and approved reply count"""
+    return comments.filter(is_approved=True).select_related('author').annotate(
+        reply_count=Count('replies', filter=Q(replies__is_approved=True))
+    )
+
+
+def attach_replies(parents, budget):
+    """Load replies breadth-first under parents, one query per level.
+
+    Stops at the comment budget or MAX_DEPTH, so a page costs at most
+    1 + MAX_DEPTH queries. This replaces loading the whole tree in one query:
+    that stayed at one query at any depth, but its size grew with the thread. Each parent keeps the oldest
+    replies that fit; comment.reply_count tells the template whether more
+    remain to be fetched from the replies endpoint.
+    """
+    for parent in parents:
+        parent.children = []
+    frontier = [parent for parent in parents if parent.reply_count]
+    depth = 0
+    while frontier and budget > 0 and depth < MAX_DEPTH:
+        by_id = {parent.id: parent for parent in frontier}
+        replies = list(
+            approved(Comment.objects.filter(parent_id__in=by_id)).order_by('id')[:budget]
+        )
+        for reply in replies:
+            reply.children = []
+            by_id[reply.parent_id].children.append(reply)
+        budget -= len(replies)
+        frontier = [reply for reply in replies if reply.reply_count]
+        depth += 1
+
+
+def load_comment_page(comments, after=None, per_page=COMMENTS_PER_PAGE, budget=COMMENT_BUDGET):
+    """Return the page of comments with id greater than after, replies attached"""
+    comments = approved(comments)
+    if after:
+        comments = comments.filter(id__gt=after)
+    rows = list(comments.order_by('id')[:per_page + 1])
+    next_cursor = rows[per_page - 1].id if len(rows) > per_page else None
+    rows = rows[:per_page]
+    attach_replies(rows, budget - len(rows))
+    return CommentPage(rows, next_cursor)
+
+
+def parse_cursor(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
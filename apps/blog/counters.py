@@ -0,0 +1,165 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+VIEW_KEY = 'blog:views:{}'
+
+# Post ids this worker has buffered hits for since its last flush
+_dirty_ids = set()
+_dirty_lock = threading.Lock()
+_flusher_started = False
+
+
+def has_shared_cache():
+    """Whether other processes see this one's buffers (LocMemCache is per process)"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def record_view(post_id):
+    """Buffer one hit for a post and return the number of hits not yet flushed"""
+    key = VIEW_KEY.format(post_id)
+    # add() is a no-op when the key exists, so concurrent workers never reset it
+    cache.add(key, 0, timeout=None)
+    try:
+        pending = cache.incr(key)
+    except ValueError:
+        # Key was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+        pending = 1
+
+    with _dirty_lock:
+        _dirty_ids.add(post_id)
+    _start_flusher()
+
+    from .trending import record_trending_view
+    record_trending_view(post_id)
+    return pending
+
+
+def pending_views(post_ids):
+    """Return {post_id: buffered hits} for the given posts"""
+    keys = {VIEW_KEY.format(post_id): post_id for post_id in post_ids}
+    buffered = cache.get_many(list(keys))
+    return {keys[key]: count for key, count in buffered.items() if count}
+
+
+def flush_views(post_ids=None):
+    """Write buffered hits to Post.views in one F() update per distinct count.
+
+    The same hits are added to today's trending buckets (PostViewDay).
+
+    Each counter is decremented by the amount read rather than deleted, so hits
+    recorded by other workers while the flush runs are kept for the next one.
+    If the database write fails, the amounts are added back before re-raising.
+    Returns the total number of hits written.
+    """
+    from .models import Post
+    from .trending import record_day_views
+
+    if post_ids is None:
+        with _dirty_lock:
+            post_ids = list(_dirty_ids)
+            _dirty_ids.clear()
+
+    # Group posts by increment so a flush costs one UPDATE per distinct count
+    by_increment = {}
+    flushed_counts = {}
+    for post_id, count in pending_views(post_ids).items():
+        try:
+            cache.decr(VIEW_KEY.format(post_id), count)
+        except ValueError:
+            continue
+        by_increment.setdefault(count, []).append(post_id)
+        flushed_counts[post_id] = count
+    if not flushed_counts:
+        return 0
+
+    try:
+        with transaction.atomic():
+            for increment, ids in by_increment.items():
+                Post.objects.filter(id__in=ids).update(views=F('views') + increment)
+            record_day_views(flushed_counts)
+    except Exception:
+        _restore_views(flushed_counts)
+        raise
+    return sum(flushed_counts.values())
+
+
+def _restore_views(counts):
+    """Put claimed hits back in the buffer after a failed write"""
+    for post_id, count in counts.items():
+        key = VIEW_KEY.format(post_id)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            cache.set(key, count, timeout=None)
+    with _dirty_lock:
+        _dirty_ids.update(counts)
+
+
+def flush_all_views(batch_size=500):
+    """Flush buffered hits for every post, for use outside the web workers"""
+    from .models import Post
+
+    ids = list(Post.objects.values_list('id', flat=True))
+    flushed = 0
+    for start in range(0, len(ids), batch_size):
+        flushed += flush_views(ids[start:start + batch_size])
+    return flushed
+
+
+def _flush_all():
+    from .readers import flush_readers
+
+    flush_views()
+    flush_readers()
+
+
+def _flush_on_exit():
+    from . import readers
+
+    if not (_dirty_ids or readers._local or readers._merged_keys):
+        return
+    try:
+        flush_views()
+        readers.merge_local_sketches()
+        readers.persist_sketches()
+    except Exception:
+        logger.exception('Post view flush at exit failed')
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            _flush_all()
+        except Exception:
+            logger.exception('Post view flush failed')
+
+
+def _start_flusher():
+    """Start this worker's background flusher on first use (after gunicorn forks)"""
+    global _flusher_started
+    if _flusher_started:
+        return
+    with _dirty_lock:
+        if _flusher_started:
+            return
+        _flusher_started = True
+
+    interval = getattr(settings, 'BLOG_VIEW_FLUSH_INTERVAL', 30)
+    threading.Thread(target=_flush_loop, args=(interval,), daemon=True).start()
+    # The test database is destroyed before atexit hooks run
+    if not getattr(settings, 'TESTING', False):
+        atexit.register(_flush_on_exit)
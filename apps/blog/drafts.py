@@ -0,0 +1,100 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import PostDraft
+
+# Editor fields an autosave may carry; media, slug and status never change here
+DRAFT_FIELDS = ('title', 'excerpt', 'content', 'content_format')
+DRAFT_KEY = 'blog:draft:{}:{}'
+# (timestamp, content digest) of the draft's last database write
+WRITE_KEY = 'blog:draft:written:{}:{}'
+# Least seconds between final writes, so a client cannot force one per request
+FINAL_WRITE_INTERVAL = 5
+# Unsaved drafts outlive a closed tab by a day even if never written to the database
+DRAFT_TIMEOUT = 60 * 60 * 24
+
+
+def _scope(user, post):
+    return user.pk, post.pk if post else 'new'
+
+
+def load_draft(user, post=None):
+    """Latest autosaved fields, from the cache or the database, or None.
+
+    The newer of the two wins: a per-process cache can hold an older draft
+    than another worker has since written to the database.
+    """
+    draft = cache.get(DRAFT_KEY.format(*_scope(user, post)))
+    row = PostDraft.objects.filter(author=user, post=post).first()
+    if row is not None:
+        saved_at = parse_datetime((draft or {}).get('saved_at') or '')
+        if draft is None or saved_at is None or saved_at < row.updated_date:
+            draft = {field: getattr(row, field) for field in DRAFT_FIELDS}
+            draft['saved_at'] = row.updated_date.isoformat()
+    return draft
+
+
+def autosave(user, post, data, final=False):
+    """Merge submitted fields into the cached draft and persist it when due.
+
+    The draft is written to the database when the last write is older than
+    BLOG_AUTOSAVE_INTERVAL. A final save (sent as the editor is hidden or
+    closed) writes sooner, after FINAL_WRITE_INTERVAL, but only if the text
+    changed since the last write; skipped edits stay in the cached draft.
+    Returns (draft, persisted), persisted meaning the database holds the draft. The post itself is never saved, so published
+    content, slugs and media stay as they are until the author saves the form.
+    """
+    scope = _scope(user, post)
+    key = DRAFT_KEY.format(*scope)
+    draft = cache.get(key) or load_draft(user, post) or {}
+    draft.update({field: data[field] for field in DRAFT_FIELDS if field in data})
+    now = timezone.now()
+    draft['saved_at'] = now.isoformat()
+    cache.set(key, draft, DRAFT_TIMEOUT)
+
+    interval = getattr(settings, 'BLOG_AUTOSAVE_INTERVAL', 30)
+    written_at, written_digest = cache.get(WRITE_KEY.format(*scope)) or (None, None)
+    digest = draft_digest(draft)
+    if digest == written_digest:
+        # The database already holds this text
+        return draft, True
+    persisted = written_at is None or now.timestamp() - written_at >= (FINAL_WRITE_INTERVAL if final else interval)
+    if persisted:
+        write_draft(user, post, draft)
+        cache.set(WRITE_KEY.format(*scope), (now.timestamp(), digest), DRAFT_TIMEOUT)
+    return draft, persisted
+
+
+def draft_digest(draft):
+    text = '\x1f'.join(str(draft.get(field) or '') for field in DRAFT_FIELDS)
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def write_draft(user, post, draft):
+    values = {field: draft.get(field) or '' for field in DRAFT_FIELDS}
+    values['updated_date'] = parse_datetime(draft['saved_at']) or timezone.now()
+    PostDraft.objects.update_or_create(author=user, post=post, defaults=values)
+
+
+def discard_draft(user, post=None):
+    """Forget the draft once the form has been saved or the author dismisses it"""
+    scope = _scope(user, post)
+    cache.delete_many([DRAFT_KEY.format(*scope), WRITE_KEY.format(*scope)])
+    PostDraft.objects.filter(author=user, post=post).delete()
+
+
+def pending_draft(user, post=None):
+    """The draft to offer for restoring: one newer than the post's last save"""
+    draft = load_draft(user, post)
+    if not draft:
+        return None
+    saved_at = parse_datetime(draft.get('saved_at') or '')
+    if post is not None and saved_at and saved_at <= post.updated_date:
+        return None
+    if post is not None and all(draft.get(field) == getattr(post, field) for field in DRAFT_FIELDS if field in draft):
+        return None
+    return draft
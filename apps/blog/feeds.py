@@ -0,0 +1,128 @@
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from my_portfolio.syndication import cached_document, content_version
+
+from .api import GENERATION_KEY
+from .models import Post, Category, Tag, CARD_DEFERRED_FIELDS
+
+FEED_LENGTH = 20
+
+
+def feed_version(request, *args, **kwargs):
+    """Feeds change only when posts, categories or tags do, which bumps the content generation"""
+    return content_version(GENERATION_KEY)
+
+
+def object_feed_version(model):
+    """feed_version for a feed of one category or tag, which must exist"""
+    def version(request, slug):
+        get_object_or_404(model.objects.only('id'), slug=slug)
+        return feed_version(request)
+    return version
+
+
+class LatestPostsFeed(Feed):
+    """Most recently published posts"""
+    title = 'Blog'
+    description = 'Latest posts from the blog'
+
+    def link(self):
+        return reverse('blog:post_list')
+
+    def latest(self, posts):
+        return (
+            posts.filter(status='published')
+            .defer(*CARD_DEFERRED_FIELDS)
+            .select_related('author')
+            .prefetch_related('tags')
+            .order_by('-published_date', '-id')[:FEED_LENGTH]
+        )
+
+    def items(self):
+        return self.latest(Post.objects.all())
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.published_date
+
+    def item_updateddate(self, item):
+        return item.updated_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [tag.name for tag in item.tags.all()]
+
+
+class AtomLatestPostsFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryFeed(LatestPostsFeed):
+    """Latest posts in one category"""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Category, slug=slug)
+
+    def title(self, obj):
+        return f'{obj.name} - Blog'
+
+    def description(self, obj):
+        return obj.description or f'Latest posts in {obj.name}'
+
+    def link(self, obj):
+        return obj.get_absolute_url()
+
+    def items(self, obj):
+        return self.latest(obj.posts.all())
+
+
+class AtomCategoryFeed(CategoryFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class TagFeed(LatestPostsFeed):
+    """Latest posts with one tag"""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Tag, slug=slug)
+
+    def title(self, obj):
+        return f'#{obj.name} - Blog'
+
+    def description(self, obj):
+        return f'Latest posts tagged {obj.name}'
+
+    def link(self, obj):
+        return obj.get_absolute_url()
+
+    def items(self, obj):
+        return self.latest(obj.posts.all())
+
+
+class AtomTagFeed(TagFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+latest_posts_rss = cached_document(feed_version)(LatestPostsFeed())
+latest_posts_atom = cached_document(feed_version)(AtomLatestPostsFeed())
+category_rss = cached_document(object_feed_version(Category))(CategoryFeed())
+category_atom = cached_document(object_feed_version(Category))(AtomCategoryFeed())
+tag_rss = cached_document(object_feed_version(Tag))(TagFeed())
+tag_atom = cached_document(object_feed_version(Tag))(AtomTagFeed())
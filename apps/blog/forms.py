@@ -2,6 +2,7 @@ from django import forms
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, Field
 from .models import Post, Comment, Category, Tag
+from .bulk import resolve_by_name
 
 class PostForm(forms.ModelForm):
     """Form for creating and editing blog posts"""
@@ -29,7 +30,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = [
-            'title', 'category', 'tags', 'content', 'excerpt',
+            'title', 'category', 'tags', 'content', 'content_format', 'excerpt',
             'featured_image', 'status', 'is_featured'
         ]
         widgets = {
@@ -48,6 +49,7 @@ class PostForm(forms.ModelForm):
                 'class': 'form-control'
             }),
             'category': forms.Select(attrs={'class': 'form-select'}),
+            'content_format': forms.Select(attrs={'class': 'form-select'}),
             'tags': forms.CheckboxSelectMultiple(),
             'status': forms.Select(attrs={'class': 'form-select'}),
         }
@@ -65,6 +67,7 @@ class PostForm(forms.ModelForm):
                 css_class='form-row'
             ),
             'content',
+            'content_format',
             'excerpt',
             'tags',
             'new_tags',
@@ -91,10 +94,8 @@ class PostForm(forms.ModelForm):
         # Handle new tags creation
         new_tags = self.cleaned_data.get('new_tags')
         if new_tags:
-            tag_names = [tag.strip() for tag in new_tags.split(',') if tag.strip()]
-            for tag_name in tag_names:
-                tag, created = Tag.objects.get_or_create(name=tag_name)
-                instance.tags.add(tag)
+            tags = resolve_by_name(Tag, new_tags.split(','))
+            instance.tags.add(*tags.values())
         
         
         # Save many-to-many relationships
@@ -0,0 +1,44 @@
+import json
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.blog.bulk import dump_front_matter, iter_records
+
+
+class Command(BaseCommand):
+    help = 'Export blog posts as JSON Lines or Markdown files with front matter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['jsonl', 'markdown'], default='jsonl')
+        parser.add_argument(
+            '--output', '-o',
+            help='JSON Lines file (default: stdout) or directory for Markdown files',
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        records = iter_records(chunk_size=options['chunk_size'])
+        count = 0
+
+        if options['format'] == 'markdown':
+            if not options['output']:
+                self.stderr.write('--output directory is required for Markdown export.')
+                return
+            directory = Path(options['output'])
+            directory.mkdir(parents=True, exist_ok=True)
+            for record in records:
+                (directory / f"{record['slug']}.md").write_text(dump_front_matter(record), encoding='utf-8')
+                count += 1
+        else:
+            stream = open(options['output'], 'w', encoding='utf-8') if options['output'] else sys.stdout
+            try:
+                for record in records:
+                    stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    count += 1
+            finally:
+                if stream is not sys.stdout:
+                    stream.close()
+
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} post(s).'))
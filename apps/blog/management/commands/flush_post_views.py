@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.blog.counters import flush_all_views, has_shared_cache
+
+
+class Command(BaseCommand):
+    help = 'Write buffered post view counts to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not has_shared_cache():
+            raise CommandError(
+                'The default cache is local to each process, so this command cannot see the '
+                'workers\' buffered views; set REDIS_URL, or rely on the workers\' own flushes.'
+            )
+        flushed = flush_all_views(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} view(s).'))
@@ -0,0 +1,73 @@
+import json
+import sys
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.blog.bulk import import_batch, load_front_matter
+
+
+class Command(BaseCommand):
+    help = 'Import blog posts from JSON Lines or Markdown files with front matter'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='.jsonl files, .md files or directories of .md files (default: JSON Lines on stdin)',
+        )
+        parser.add_argument('--author', help='Username for posts whose author does not exist')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--skip-existing', action='store_true', help='Skip records whose slug already exists')
+
+    def iter_records(self, paths):
+        if not paths:
+            yield from self.iter_jsonl(sys.stdin)
+            return
+        for path in map(Path, paths):
+            if path.is_dir():
+                for file in sorted(path.glob('*.md')):
+                    yield load_front_matter(file.read_text(encoding='utf-8'))
+            elif path.suffix == '.md':
+                yield load_front_matter(path.read_text(encoding='utf-8'))
+            else:
+                with open(path, encoding='utf-8') as stream:
+                    yield from self.iter_jsonl(stream)
+
+    def iter_jsonl(self, stream):
+        for number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise CommandError(f'Line {number}: {e}')
+
+    def import_batch(self, batch, default_author, skip_existing):
+        try:
+            return len(import_batch(batch, default_author, skip_existing))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def handle(self, *args, **options):
+        if options['author']:
+            default_author = User.objects.filter(username=options['author']).first()
+            if default_author is None:
+                raise CommandError(f"User {options['author']!r} does not exist.")
+        else:
+            default_author = User.objects.filter(is_superuser=True).order_by('id').first()
+            if default_author is None:
+                raise CommandError('No superuser found; pass --author.')
+
+        batch, created = [], 0
+        for record in self.iter_records(options['paths']):
+            if not record.get('title'):
+                self.stderr.write('Skipping record without a title.')
+                continue
+            batch.append(record)
+            if len(batch) >= options['batch_size']:
+                created += self.import_batch(batch, default_author, options['skip_existing'])
+                batch = []
+        if batch:
+            created += self.import_batch(batch, default_author, options['skip_existing'])
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {created} post(s).'))
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.blog.counters import has_shared_cache
+from apps.blog.models import Post
+from apps.blog.readers import persist_sketches
+
+
+class Command(BaseCommand):
+    help = 'Write the cached unique-reader sketches of recent days to the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help='Days of daily sketches to persist')
+
+    def handle(self, *args, **options):
+        if not has_shared_cache():
+            raise CommandError(
+                'The default cache is local to each process, so this command cannot see the '
+                'workers\' buffered reader sketches; set REDIS_URL, or rely on the workers\' own flushes.'
+            )
+        today = timezone.localdate()
+        periods = ['all'] + [(today - timedelta(days=offset)).isoformat() for offset in range(options['days'])]
+        ids = Post.objects.filter(status='published').values_list('id', flat=True)
+        written = persist_sketches({(post_id, period) for post_id in ids for period in periods})
+        self.stdout.write(self.style.SUCCESS(f'Persisted {written} reader sketch(es).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.archive import rebuild_archive
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly archive rollup from published post dates'
+
+    def handle(self, *args, **options):
+        months = rebuild_archive()
+        self.stdout.write(self.style.SUCCESS(f'Archive rebuilt with {months} month(s).'))
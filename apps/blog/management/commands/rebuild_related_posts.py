@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.related import TOP_N, rebuild_related
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related-posts table for every published post'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=TOP_N, help='Neighbours stored per post')
+
+    def handle(self, *args, **options):
+        count = rebuild_related(options['top'])
+        self.stdout.write(self.style.SUCCESS(f'Related posts rebuilt for {count} post(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.search import update_search_vector
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored full-text search vector for every post'
+
+    def handle(self, *args, **options):
+        update_search_vector()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
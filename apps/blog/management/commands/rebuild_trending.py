@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.blog.counters import flush_all_views, has_shared_cache
+from apps.blog.trending import get_leaderboard, prune_view_days
+
+
+class Command(BaseCommand):
+    help = (
+        'Flush buffered views, drop expired day buckets and reload the shared trending '
+        'leaderboard. Needs REDIS_URL: without it views are buffered and boards kept per '
+        'worker process, out of this command\'s reach (workers refresh and prune on their own).'
+    )
+
+    def handle(self, *args, **options):
+        if not has_shared_cache():
+            raise CommandError(
+                'The default cache is local to each process, so this command can neither flush '
+                'the workers\' buffered views nor reload their leaderboards; set REDIS_URL.'
+            )
+        flushed = flush_all_views()
+        pruned = prune_view_days()
+        get_leaderboard().rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Flushed {flushed} view(s), pruned {pruned} day bucket(s), leaderboard rebuilt.'
+        ))
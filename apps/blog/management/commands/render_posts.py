@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import Post
+from apps.blog.rendering import render_post
+
+
+class Command(BaseCommand):
+    help = 'Regenerate stored HTML, word counts, reading times and excerpts for posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('id', 'content', 'content_format', 'excerpt').order_by('id')
+        fields = ['content_html', 'word_count', 'reading_minutes', 'excerpt']
+
+        batch = []
+        rendered = 0
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(render_post(post))
+            if len(batch) >= batch_size:
+                Post.objects.bulk_update(batch, fields)
+                rendered += len(batch)
+                batch = []
+        if batch:
+            Post.objects.bulk_update(batch, fields)
+            rendered += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} post(s).'))
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_search_vector_post_blog_post_search__528e75_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_format',
+            field=models.CharField(choices=[('text', 'Plain text'), ('markdown', 'Markdown')], default='text', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
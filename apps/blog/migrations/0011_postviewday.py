@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_relatedpost'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', '-views'], name='blog_post_status_7ef12d_idx'),
+        ),
+        migrations.AddField(
+            model_name='postviewday',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_days', to='blog.post'),
+        ),
+        migrations.AddIndex(
+            model_name='postviewday',
+            index=models.Index(fields=['day'], name='blog_postvi_day_866501_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='postviewday',
+            constraint=models.UniqueConstraint(fields=('post', 'day'), name='unique_post_view_day'),
+        ),
+    ]
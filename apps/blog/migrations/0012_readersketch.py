@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_postviewday'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='readers',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ReaderSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(blank=True, null=True)),
+                ('sketch', models.BinaryField()),
+                ('readers', models.PositiveIntegerField(default=0)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reader_sketches', to='blog.post')),
+            ],
+            options={
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('post', 'day'), name='unique_reader_sketch_day'), models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('post',), name='unique_reader_sketch_all_time')],
+            },
+        ),
+    ]
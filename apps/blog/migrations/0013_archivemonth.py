@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_archive(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ArchiveMonth = apps.get_model('blog', 'ArchiveMonth')
+    counts = {}
+    for published_date in Post.objects.filter(
+        status='published', published_date__isnull=False
+    ).values_list('published_date', flat=True):
+        local = timezone.localtime(published_date)
+        counts[(local.year, local.month)] = counts.get((local.year, local.month), 0) + 1
+    ArchiveMonth.objects.bulk_create([
+        ArchiveMonth(year=year, month=month, post_count=count)
+        for (year, month), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_readersketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('post_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+                'constraints': [models.UniqueConstraint(fields=('year', 'month'), name='unique_archive_month')],
+            },
+        ),
+        migrations.RunPython(populate_archive, migrations.RunPython.noop),
+    ]
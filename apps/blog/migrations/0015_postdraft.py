@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_postrevision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostDraft',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('excerpt', models.TextField(blank=True, max_length=300)),
+                ('content', models.TextField(blank=True)),
+                ('content_format', models.CharField(blank=True, max_length=10)),
+                ('updated_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_drafts', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='drafts', to='blog.post')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('author', 'post'), name='unique_post_draft'), models.UniqueConstraint(condition=models.Q(('post__isnull', True)), fields=('author',), name='unique_new_post_draft')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def populate_terms(apps, schema_editor):
+    # Pure text functions only; the historical models do the database work
+    from apps.blog.related import term_counts, weigh
+
+    Post = apps.get_model('blog', 'Post')
+    RelatedTerm = apps.get_model('blog', 'RelatedTerm')
+    counts_by_post = {
+        post_id: term_counts(title, excerpt)
+        for post_id, title, excerpt in Post.objects.filter(status='published').values_list('id', 'title', 'excerpt')
+    }
+    document_frequency = Counter()
+    for counts in counts_by_post.values():
+        document_frequency.update(counts.keys())
+    RelatedTerm.objects.bulk_create([
+        RelatedTerm(post_id=post_id, term=term, weight=weight)
+        for post_id, counts in counts_by_post.items()
+        for term, weight in weigh(counts, document_frequency, len(counts_by_post)).items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_postdraft'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('weight', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_terms', to='blog.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term'], name='blog_relate_term_0c4c2b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'term'), name='unique_related_term')],
+            },
+        ),
+        migrations.RunPython(populate_terms, migrations.RunPython.noop),
+    ]
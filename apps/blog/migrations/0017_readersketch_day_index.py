@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_relatedterm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='readersketch',
+            index=models.Index(fields=['day'], name='blog_reader_day_9eadf8_idx'),
+        ),
+    ]
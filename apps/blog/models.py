@@ -1,11 +1,14 @@
+import datetime
+
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.urls import reverse
 from django.utils.text import slugify
-from my_portfolio.settings import supabase  # import the client
-import os
+from my_portfolio.images import schedule_variants
 
 
 class Category(models.Model):
@@ -52,6 +55,19 @@ class Tag(models.Model):
         return reverse('blog:tag_posts', kwargs={'slug': self.slug})
 
 
+# Long text columns that post cards and lists never display
+CARD_DEFERRED_FIELDS = ('content', 'content_html', 'search_vector')
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(status='published')
+    
+    def cards(self):
+        """Posts for lists and cards, without the body and search columns"""
+        return self.defer(*CARD_DEFERRED_FIELDS)
+
+
 class Post(models.Model):
     """Blog post model"""
     STATUS_CHOICES = [
@@ -59,6 +75,11 @@ class Post(models.Model):
         ('published', 'Published'),
     ]
     
+    FORMAT_CHOICES = [
+        ('text', 'Plain text'),
+        ('markdown', 'Markdown'),
+    ]
+    
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blog_posts',default=1)
@@ -71,6 +92,15 @@ class Post(models.Model):
     )
     tags = models.ManyToManyField(Tag, blank=True, related_name='posts')
     content = models.TextField()
+    content_format = models.CharField(
+        max_length=10,
+        choices=FORMAT_CHOICES,
+        default='text'
+    )
+    # Derived from content on save; see rendering.render_post
+    content_html = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_minutes = models.PositiveSmallIntegerField(default=1, editable=False)
     excerpt = models.TextField(
         max_length=300,
         blank=True,
@@ -81,6 +111,8 @@ class Post(models.Model):
         blank=True,
         null=True
     )
+    # Resized WebP/JPEG derivatives; see my_portfolio.images
+    featured_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(
         max_length=10,
         choices=STATUS_CHOICES,
@@ -91,54 +123,52 @@ class Post(models.Model):
         help_text="Display on homepage"
     )
     views = models.PositiveIntegerField(default=0)
+    # Estimated distinct readers, persisted from the HyperLogLog sketches
+    readers = models.PositiveIntegerField(default=0, editable=False)
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
     published_date = models.DateTimeField(blank=True, null=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    objects = PostQuerySet.as_manager()
     
     class Meta:
         ordering = ['-published_date', '-created_date']
         indexes = [
             models.Index(fields=['-published_date']),
             models.Index(fields=['status']),
+            models.Index(fields=['status', '-views']),
+            GinIndex(fields=['search_vector']),
         ]
     
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            # Ensure slug is unique across all posts
-            while Post.objects.filter(slug=slug).exclude(id=self.id).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            # Ensure slug is unique across all posts, with one lookup
+            from .bulk import allocate_slugs
+            self.slug = allocate_slugs([slugify(self.title) or 'post'], exclude_id=self.id)[0]
 
         if self.status == 'published' and not self.published_date:
             self.published_date = timezone.now()
 
-        if not self.excerpt and self.content:
-            self.excerpt = self.content[:297] + '...' if len(self.content) > 300 else self.content
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'content', 'content_format'} & set(update_fields):
+            from .rendering import render_post
+            render_post(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'content_html', 'word_count', 'reading_minutes', 'excerpt'
+                }
 
         super().save(*args, **kwargs)
-        
-        if self.featured_image:
-            file_path = self.featured_image.name           
-            # Check if file already exists in Supabase
-            try:
-                supabase.storage.from_("media").upload(
-            file_path, 
-            open(self.featured_image.path, "rb").read()
-        )
-                
-            except Exception as e:
-                print("Supabase upload error:", e)
-            
-            # Optional: remove local file after upload
-            if os.path.exists(self.featured_image.path):
-                os.remove(self.featured_image.path)
 
-    
+        if update_fields is None or {'title', 'excerpt', 'content'} & set(update_fields):
+            from .search import update_search_vector
+            update_search_vector([self.id])
+
+        if update_fields is None or 'featured_image' in update_fields:
+            schedule_variants(self, 'featured_image', 'featured_image_variants')
+
     def __str__(self):
         return self.title
     
@@ -146,17 +176,168 @@ class Post(models.Model):
         return reverse('blog:post_detail', kwargs={'slug': self.slug})
     
     def increment_views(self):
-        """Increment post view count"""
-        self.views += 1
-        self.save(update_fields=['views'])
+        """Buffer a hit for this post; counts reach the database in batches"""
+        from .counters import record_view
+        buffered = record_view(self.id)
+        # Show hits not yet flushed, without double counting repeated calls
+        self.views += buffered - getattr(self, '_buffered_views', 0)
+        self._buffered_views = buffered
     
     @property
     def reading_time(self):
-        """Calculate estimated reading time in minutes"""
-        words_per_minute = 200
-        word_count = len(self.content.split())
-        minutes = word_count / words_per_minute
-        return max(1, round(minutes))
+        """Estimated reading time in minutes, computed when the post is saved"""
+        return self.reading_minutes
+
+
+class RelatedPost(models.Model):
+    """Precomputed neighbour of a post, scored by tag overlap and text similarity"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='unique_related_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-score']),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} -> {self.related_id} ({self.score:.3f})'
+
+
+class RelatedTerm(models.Model):
+    """TF-IDF weight of a term in a published post; the postings related posts are found by"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_terms')
+    term = models.CharField(max_length=100)
+    weight = models.FloatField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'term'], name='unique_related_term'),
+        ]
+        indexes = [
+            models.Index(fields=['term']),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id}: {self.term} ({self.weight:.3f})'
+
+
+class PostViewDay(models.Model):
+    """Views a post received on one day, the input of the trending leaderboard"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='view_days')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'day'], name='unique_post_view_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} on {self.day}: {self.views}'
+
+
+class ReaderSketch(models.Model):
+    """HyperLogLog sketch of a post's readers on one day, or all time when day is null"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='reader_sketches')
+    day = models.DateField(null=True, blank=True)
+    sketch = models.BinaryField()
+    readers = models.PositiveIntegerField(default=0)
+    updated_date = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'day'], name='unique_reader_sketch_day'),
+            models.UniqueConstraint(
+                fields=['post'], condition=models.Q(day__isnull=True),
+                name='unique_reader_sketch_all_time',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} on {self.day or "all time"}: ~{self.readers} readers'
+
+
+class ArchiveMonth(models.Model):
+    """Number of posts published in a month, maintained on publish and unpublish"""
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    post_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='unique_archive_month'),
+        ]
+    
+    def __str__(self):
+        return f'{self.year}-{self.month:02d}: {self.post_count}'
+    
+    @property
+    def first_day(self):
+        return datetime.date(self.year, self.month, 1)
+    
+    def get_absolute_url(self):
+        return reverse('blog:archive_month', kwargs={'year': self.year, 'month': self.month})
+
+
+class PostRevision(models.Model):
+    """One saved version of a post: a full snapshot, or a delta from the previous revision"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    # Snapshot: every versioned field. Delta: line operations for content plus
+    # any other versioned field that changed; see apps.blog.revisions
+    data = models.JSONField()
+    author = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='post_revisions'
+    )
+    created_date = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-number']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'number'], name='unique_post_revision'),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} r{self.number}'
+
+
+class PostDraft(models.Model):
+    """Autosaved editor state, kept apart from the post until it is saved explicitly"""
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='post_drafts')
+    # Null while the post is still being created
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True, related_name='drafts')
+    title = models.CharField(max_length=200, blank=True)
+    excerpt = models.TextField(max_length=300, blank=True)
+    content = models.TextField(blank=True)
+    content_format = models.CharField(max_length=10, blank=True)
+    updated_date = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['author', 'post'], name='unique_post_draft'),
+            models.UniqueConstraint(
+                fields=['author'], condition=models.Q(post__isnull=True),
+                name='unique_new_post_draft',
+            ),
+        ]
+    
+    def __str__(self):
+        return f'Draft of {self.post_id or "new post"} by {self.author_id}'
 
 
 class Comment(models.Model):
@@ -0,0 +1,101 @@
+import base64
+import binascii
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(post):
+    raw = f'{post.published_date.isoformat()}|{post.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (published_date, id) from a cursor, or None if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        date_part, id_part = raw.rsplit('|', 1)
+        published_date = parse_datetime(date_part)
+        post_id = int(id_part)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+    if published_date is None:
+        return None
+    return published_date, post_id
+
+
+class KeysetPage:
+    """A page of posts located by (published_date, id) instead of OFFSET"""
+    paginator = None
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def keyset_page(posts, after=None, before=None, per_page=6):
+    """Return the page of posts after (older than) or before (newer than) a cursor.
+
+    Posts are ordered newest first on (published_date, id), so each page is a
+    range scan on the published_date index and costs the same at any depth.
+    """
+    posts = posts.filter(published_date__isnull=False)
+    after = decode_cursor(after) if after else None
+    before = decode_cursor(before) if before else None
+
+    if before:
+        published_date, post_id = before
+        rows = list(posts.filter(
+            Q(published_date__gt=published_date) |
+            Q(published_date=published_date, id__gt=post_id)
+        ).order_by('published_date', 'id')[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        newer, older = has_more, True
+    else:
+        if after:
+            published_date, post_id = after
+            posts = posts.filter(
+                Q(published_date__lt=published_date) |
+                Q(published_date=published_date, id__lt=post_id)
+            )
+        rows = list(posts.order_by('-published_date', '-id')[:per_page + 1])
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        newer, older = bool(after), has_more
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if rows and older else None,
+        previous_cursor=encode_cursor(rows[0]) if rows and newer else None,
+    )
+
+
+def paginate_posts(request, posts, per_page=6):
+    """Cursor-paginate posts, or use page numbers when ?page= is requested"""
+    if 'page' in request.GET:
+        paginator = Paginator(posts, per_page)
+        return paginator.get_page(request.GET.get('page'))
+    return keyset_page(
+        posts,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        per_page=per_page,
+    )
@@ -0,0 +1,207 @@
+import math
+import re
+import threading
+import time
+from datetime import timedelta
+
+import mmh3
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# 2**12 one-byte registers: 4 KB per sketch, about 1.6% standard error
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64
+
+SKETCH_KEY = 'blog:readers:{}:{}'
+LOCK_KEY = 'blog:readers:lock:{}:{}'
+LOCK_TIMEOUT = 10
+# Sketches stay in the cache a little longer than the persist interval
+SKETCH_TIMEOUT = 60 * 60 * 48
+
+BOT_PATTERN = re.compile(r'bot|crawl|spider|slurp|fetch|preview|monitor|curl|wget|python-requests', re.I)
+
+# Sketches this worker has added readers to since its last merge into the cache
+_local = {}
+_local_lock = threading.Lock()
+# Cache keys merged by this worker since its last persist
+_merged_keys = set()
+_last_persist = time.monotonic()
+
+
+class HyperLogLog:
+    """Fixed-size distinct-count estimator over 64-bit MurmurHash3 values"""
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers) if registers else bytearray(REGISTERS)
+
+    def add(self, value):
+        hashed = mmh3.hash64(str(value), signed=False)[0]
+        index = hashed >> (HASH_BITS - PRECISION)
+        rest = hashed & ((1 << (HASH_BITS - PRECISION)) - 1)
+        rank = HASH_BITS - PRECISION - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Union with another sketch in place (register-wise maximum)"""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / REGISTERS)
+        estimate = alpha * REGISTERS * REGISTERS / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * REGISTERS and zeros:
+            # Linear counting is more accurate while most registers are empty
+            estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return round(estimate)
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(data) if data else cls()
+
+
+def visitor_id(request):
+    """Stable identifier of the reader behind a request, or None for bots"""
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if not user_agent or BOT_PATTERN.search(user_agent):
+        return None
+    if request.user.is_authenticated:
+        return f'user:{request.user.id}'
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    address = forwarded.split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+    return f'anon:{address}:{user_agent}'
+
+
+def record_reader(post_id, visitor):
+    """Add a reader to this worker's sketches for today and for all time; no I/O"""
+    today = timezone.localdate().isoformat()
+    with _local_lock:
+        for period in (today, 'all'):
+            _local.setdefault((post_id, period), HyperLogLog()).add(visitor)
+
+
+def _acquire(post_id, period, attempts=20):
+    for _ in range(attempts):
+        if cache.add(LOCK_KEY.format(post_id, period), 1, LOCK_TIMEOUT):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _release(post_id, period):
+    cache.delete(LOCK_KEY.format(post_id, period))
+
+
+def merge_local_sketches():
+    """Merge this worker's sketches into the shared ones in the cache.
+
+    Each shared sketch is updated under a short cache lock so concurrent
+    workers never overwrite each other's registers. Sketches whose lock could
+    not be taken stay local until the next merge. Returns the number merged.
+    """
+    with _local_lock:
+        pending = dict(_local)
+        _local.clear()
+
+    merged = 0
+    for (post_id, period), sketch in pending.items():
+        if not _acquire(post_id, period):
+            with _local_lock:
+                _local.setdefault((post_id, period), HyperLogLog()).merge(sketch)
+            continue
+        try:
+            key = SKETCH_KEY.format(post_id, period)
+            shared = HyperLogLog.from_bytes(cache.get(key)).merge(sketch)
+            cache.set(key, shared.to_bytes(), SKETCH_TIMEOUT)
+        finally:
+            _release(post_id, period)
+        _merged_keys.add((post_id, period))
+        merged += 1
+    return merged
+
+
+def persist_sketches(keys=None):
+    """Write shared sketches to ReaderSketch rows and refresh Post.readers.
+
+    Stored and cached sketches are merged, so neither an evicted cache entry
+    nor a stale row loses readers. Daily sketches older than the trending
+    window are deleted. Returns the number of sketches written.
+    """
+    from .models import Post, ReaderSketch
+
+    global _last_persist
+    if keys is None:
+        keys = set(_merged_keys)
+        _merged_keys.clear()
+    _last_persist = time.monotonic()
+    prune_sketches()
+    if not keys:
+        return 0
+
+    cached = cache.get_many([SKETCH_KEY.format(post_id, period) for post_id, period in keys])
+    keys = [key for key in keys if SKETCH_KEY.format(*key) in cached]
+    readers = {}
+    with transaction.atomic():
+        for post_id, period in keys:
+            day = None if period == 'all' else period
+            row, _ = ReaderSketch.objects.select_for_update().get_or_create(
+                post_id=post_id, day=day, defaults={'sketch': b''},
+            )
+            sketch = HyperLogLog.from_bytes(bytes(row.sketch))
+            sketch.merge(HyperLogLog.from_bytes(cached.get(SKETCH_KEY.format(post_id, period))))
+            row.sketch = sketch.to_bytes()
+            row.readers = sketch.count()
+            row.save(update_fields=['sketch', 'readers', 'updated_date'])
+            if day is None:
+                readers[post_id] = row.readers
+
+        posts = [Post(id=post_id, readers=count) for post_id, count in readers.items()]
+        Post.objects.bulk_update(posts, ['readers'])
+    return len(keys)
+
+
+def flush_readers():
+    """Merge local sketches and, every BLOG_READERS_PERSIST_INTERVAL, persist them"""
+    merge_local_sketches()
+    interval = getattr(settings, 'BLOG_READERS_PERSIST_INTERVAL', 300)
+    if time.monotonic() - _last_persist >= interval:
+        persist_sketches()
+
+
+def prune_sketches():
+    """Delete daily sketches older than the trending window; all-time ones are kept"""
+    from .models import ReaderSketch
+    from .trending import window_start
+
+    deleted, _ = ReaderSketch.objects.filter(day__lte=window_start()).delete()
+    return deleted
+
+
+def daily_readers(post_id, days=7):
+    """Estimated distinct readers of a post on each of the last days, newest first.
+
+    Stored sketches are merged with the cached ones, so readers not yet
+    persisted are counted too.
+    """
+    from .models import ReaderSketch
+
+    today = timezone.localdate()
+    dates = [today - timedelta(days=offset) for offset in range(days)]
+    stored = dict(
+        ReaderSketch.objects.filter(post_id=post_id, day__in=dates).values_list('day', 'sketch')
+    )
+    cached = cache.get_many([SKETCH_KEY.format(post_id, day.isoformat()) for day in dates])
+    counts = []
+    for day in dates:
+        sketch = HyperLogLog.from_bytes(cached.get(SKETCH_KEY.format(post_id, day.isoformat())))
+        if day in stored:
+            sketch.merge(HyperLogLog.from_bytes(bytes(stored[day])))
+        counts.append((day, sketch.count()))
+    return counts
@@ -0,0 +1,258 @@
+import logging
+import math
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count
+
+from .models import Post, RelatedPost, RelatedTerm
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Neighbours stored per post
+TOP_N = 5
+# Share of the score from tag overlap (Jaccard); the rest is TF-IDF cosine
+TAG_WEIGHT = 0.6
+TEXT_WEIGHT = 0.4
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in',
+    'is', 'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what',
+    'with', 'you', 'your', 'i', 'we', 'my', 'our',
+}
+
+_update_lock = threading.Lock()
+# One worker per process: updates run in order and never pile up threads
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='related-posts')
+
+
+def term_counts(title, excerpt):
+    return Counter(
+        term[:100] for term in tokenize(f'{title} {excerpt}')
+        if term not in STOP_WORDS and len(term) > 1
+    )
+
+
+def weigh(counts, document_frequency, total):
+    """Unit-length TF-IDF vector of a post's term counts"""
+    vector = {
+        term: (1 + math.log(count)) * math.log(1 + total / document_frequency[term])
+        for term, count in counts.items()
+    }
+    norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+    return {term: weight / norm for term, weight in vector.items()}
+
+
+def top_scores(scores, n=TOP_N):
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:n]
+
+
+def combine(tags, other_tags, cosine):
+    union = tags | other_tags
+    jaccard = len(tags & other_tags) / len(union) if union else 0.0
+    return TAG_WEIGHT * jaccard + TEXT_WEIGHT * cosine
+
+
+class Corpus:
+    """TF-IDF vectors and tag sets of every published post, with postings"""
+
+    def __init__(self):
+        posts = Post.objects.filter(status='published').values_list('id', 'title', 'excerpt')
+        tag_rows = Post.tags.through.objects.filter(
+            post__status='published'
+        ).values_list('post_id', 'tag_id')
+
+        self.tags = defaultdict(set)
+        self.tag_postings = defaultdict(set)
+        for post_id, tag_id in tag_rows:
+            self.tags[post_id].add(tag_id)
+            self.tag_postings[tag_id].add(post_id)
+
+        counts_by_post = {}
+        document_frequency = Counter()
+        for post_id, title, excerpt in posts:
+            counts = term_counts(title, excerpt)
+            counts_by_post[post_id] = counts
+            document_frequency.update(counts.keys())
+
+        self.ids = set(counts_by_post)
+        total = len(counts_by_post)
+        self.vectors = {}
+        self.term_postings = defaultdict(set)
+        for post_id, counts in counts_by_post.items():
+            self.vectors[post_id] = weigh(counts, document_frequency, total)
+            for term in counts:
+                self.term_postings[term].add(post_id)
+
+    def scores_for(self, post_id):
+        """Return {other_id: score} for every post sharing a tag or a term"""
+        if post_id not in self.ids:
+            return {}
+        vector = self.vectors[post_id]
+        tags = self.tags.get(post_id, set())
+
+        candidates = set()
+        for term in vector:
+            candidates |= self.term_postings[term]
+        for tag_id in tags:
+            candidates |= self.tag_postings[tag_id]
+        candidates.discard(post_id)
+
+        scores = {}
+        for other_id in candidates:
+            other_vector = self.vectors[other_id]
+            cosine = sum(weight * other_vector.get(term, 0.0) for term, weight in vector.items())
+            score = combine(tags, self.tags.get(other_id, set()), cosine)
+            if score > 0:
+                scores[other_id] = score
+        return scores
+
+    def top_for(self, post_id, n=TOP_N):
+        return top_scores(self.scores_for(post_id), n)
+
+
+def store_neighbours(neighbours_by_post):
+    """Replace the stored neighbours of the given posts"""
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=neighbours_by_post).delete()
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=post_id, related_id=related_id, score=score)
+            for post_id, neighbours in neighbours_by_post.items()
+            for related_id, score in neighbours
+        ])
+
+
+def rebuild_related(n=TOP_N):
+    """Recompute term weights and neighbours for every published post"""
+    with _update_lock:
+        corpus = Corpus()
+        with transaction.atomic():
+            RelatedTerm.objects.all().delete()
+            RelatedTerm.objects.bulk_create([
+                RelatedTerm(post_id=post_id, term=term, weight=weight)
+                for post_id, vector in corpus.vectors.items()
+                for term, weight in vector.items()
+            ], batch_size=1000)
+            RelatedPost.objects.all().delete()
+            store_neighbours({post_id: corpus.top_for(post_id, n) for post_id in corpus.ids})
+        return len(corpus.ids)
+
+
+def index_terms(post_ids):
+    """Replace the stored term weights of the given posts.
+
+    Document frequencies come from the stored postings, so only the changed
+    posts are tokenized; other posts keep the weights from when they were
+    last indexed until rebuild_related_posts refreshes them all.
+    """
+    posts = Post.objects.filter(id__in=post_ids, status='published').values_list('id', 'title', 'excerpt')
+    counts_by_post = {post_id: term_counts(title, excerpt) for post_id, title, excerpt in posts}
+    terms = set().union(*counts_by_post.values())
+
+    document_frequency = Counter(dict(
+        RelatedTerm.objects.filter(term__in=terms).exclude(post_id__in=post_ids)
+        .values('term').annotate(posts=Count('id')).values_list('term', 'posts')
+    ))
+    for counts in counts_by_post.values():
+        document_frequency.update(counts.keys())
+    total = Post.objects.filter(status='published').count()
+
+    with transaction.atomic():
+        RelatedTerm.objects.filter(post_id__in=post_ids).delete()
+        RelatedTerm.objects.bulk_create([
+            RelatedTerm(post_id=post_id, term=term, weight=weight)
+            for post_id, counts in counts_by_post.items()
+            for term, weight in weigh(counts, document_frequency, total).items()
+        ])
+
+
+def score_post(post_id):
+    """Return {other_id: score} for the posts sharing a stored term or a tag with a post"""
+    if not Post.objects.filter(id=post_id, status='published').exists():
+        return {}
+    through = Post.tags.through.objects
+    vector = dict(RelatedTerm.objects.filter(post_id=post_id).values_list('term', 'weight'))
+    tags = set(through.filter(post_id=post_id).values_list('tag_id', flat=True))
+
+    cosines = defaultdict(float)
+    for other_id, term, weight in (
+        RelatedTerm.objects.filter(term__in=vector).exclude(post_id=post_id)
+        .values_list('post_id', 'term', 'weight')
+    ):
+        cosines[other_id] += vector[term] * weight
+    candidates = set(cosines) | set(
+        through.filter(tag_id__in=tags, post__status='published').exclude(post_id=post_id)
+        .values_list('post_id', flat=True)
+    )
+
+    other_tags = defaultdict(set)
+    for other_id, tag_id in through.filter(post_id__in=candidates).values_list('post_id', 'tag_id'):
+        other_tags[other_id].add(tag_id)
+
+    scores = {}
+    for other_id in candidates:
+        score = combine(tags, other_tags[other_id], cosines.get(other_id, 0.0))
+        if score > 0:
+            scores[other_id] = score
+    return scores
+
+
+def update_related(post_ids, n=TOP_N):
+    """Incrementally refresh neighbours after the given posts changed.
+
+    Only the changed posts are scored, against the posts sharing a term or a
+    tag with them. A post that listed a changed post is rescored too, as its
+    score for it may have dropped; any other post merges its new scores with
+    the changed posts into its stored list.
+    """
+    with _update_lock:
+        changed = set(post_ids)
+        index_terms(changed)
+        new_scores = {post_id: score_post(post_id) for post_id in changed}
+        neighbours = {post_id: top_scores(scores, n) for post_id, scores in new_scores.items()}
+
+        linking = set(
+            RelatedPost.objects.filter(related_id__in=changed).values_list('post_id', flat=True)
+        ) - changed
+        for post_id in linking:
+            neighbours[post_id] = top_scores(score_post(post_id), n)
+
+        # Scores are symmetric, so a changed post's score for another is also
+        # that post's score for the changed one
+        others = set().union(*(scores.keys() for scores in new_scores.values())) - changed - linking
+        stored = defaultdict(dict)
+        for post_id, related_id, score in RelatedPost.objects.filter(
+            post_id__in=others
+        ).values_list('post_id', 'related_id', 'score'):
+            stored[post_id][related_id] = score
+        for post_id in others:
+            current = stored[post_id]
+            merged = dict(current)
+            for changed_id, scores in new_scores.items():
+                if post_id in scores:
+                    merged[changed_id] = scores[post_id]
+            top = top_scores(merged, n)
+            if dict(top) != current:
+                neighbours[post_id] = top
+
+        store_neighbours(neighbours)
+        return len(neighbours)
+
+
+def schedule_update(post_ids):
+    """Refresh neighbours on the shared background worker once the transaction commits"""
+    post_ids = list(post_ids)
+
+    def run():
+        close_old_connections()
+        try:
+            update_related(post_ids)
+        except Exception:
+            logger.exception('Related posts update failed for %s', post_ids)
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: _executor.submit(run))
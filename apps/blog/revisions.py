@@ -0,0 +1,148 @@
+from difflib import HtmlDiff, SequenceMatcher
+
+from django.db import transaction
+
+from .models import Post, PostRevision
+
+# Fields whose history is kept
+REVISION_FIELDS = ('title', 'excerpt', 'content', 'content_format')
+# Every SNAPSHOT_INTERVAL-th revision stores the full post, so rebuilding any
+# version reads at most SNAPSHOT_INTERVAL rows
+SNAPSHOT_INTERVAL = 10
+
+
+def post_state(post):
+    return {field: getattr(post, field) for field in REVISION_FIELDS}
+
+
+def is_snapshot_number(number):
+    return (number - 1) % SNAPSHOT_INTERVAL == 0
+
+
+def snapshot_base(number):
+    """Number of the snapshot a revision is rebuilt from"""
+    return number - (number - 1) % SNAPSHOT_INTERVAL
+
+
+def make_delta(old, new):
+    """Line operations turning old into new.
+
+    A positive int keeps that many lines, a negative int drops that many, and
+    a list inserts its lines. Unchanged text is never stored.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    operations = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            operations.append(i2 - i1)
+            continue
+        if i2 > i1:
+            operations.append(-(i2 - i1))
+        if j2 > j1:
+            operations.append(new_lines[j1:j2])
+    return operations
+
+
+def apply_delta(old, operations):
+    old_lines = old.splitlines(keepends=True)
+    position = 0
+    result = []
+    for operation in operations:
+        if isinstance(operation, list):
+            result.extend(operation)
+        elif operation > 0:
+            result.extend(old_lines[position:position + operation])
+            position += operation
+        else:
+            position -= operation
+    return ''.join(result)
+
+
+def state_delta(old, new):
+    delta = {field: new[field] for field in REVISION_FIELDS if field != 'content' and new[field] != old[field]}
+    delta['content'] = make_delta(old['content'], new['content'])
+    return delta
+
+
+def apply_state_delta(state, delta):
+    state = dict(state)
+    for field, value in delta.items():
+        state[field] = apply_delta(state[field], value) if field == 'content' else value
+    return state
+
+
+def rebuild(revisions):
+    """Fold a snapshot and the deltas after it (in number order) into a state"""
+    state = None
+    for revision in revisions:
+        if revision.is_snapshot:
+            state = dict(revision.data)
+        else:
+            state = apply_state_delta(state, revision.data)
+    return state
+
+
+def revision_state(post_id, number):
+    """Field values of a post at a revision, read with one bounded query"""
+    revisions = list(PostRevision.objects.filter(
+        post_id=post_id, number__gte=snapshot_base(number), number__lte=number,
+    ).order_by('number'))
+    if not revisions or revisions[-1].number != number:
+        raise PostRevision.DoesNotExist(f'Post {post_id} has no revision {number}')
+    return rebuild(revisions)
+
+
+def record_revision(post, author=None):
+    """Store the post's current fields as its next revision.
+
+    Returns the new revision, or None when nothing versioned changed.
+    """
+    state = post_state(post)
+    with transaction.atomic():
+        # Lock the post row so concurrent saves cannot take the same number
+        Post.objects.select_for_update().filter(pk=post.pk).exists()
+        last = PostRevision.objects.filter(post=post).order_by('-number').first()
+        number = last.number + 1 if last else 1
+        previous = revision_state(post.pk, last.number) if last else None
+        if previous == state:
+            return None
+
+        snapshot = is_snapshot_number(number)
+        return PostRevision.objects.create(
+            post=post,
+            number=number,
+            is_snapshot=snapshot,
+            data=state if snapshot else state_delta(previous, state),
+            author=author,
+        )
+
+
+def ensure_initial_revision(post, author=None):
+    """Record the stored version of a post that predates revision history"""
+    if not PostRevision.objects.filter(post=post).exists():
+        record_revision(Post.objects.get(pk=post.pk), author)
+
+
+def restore_revision(post, number, author=None):
+    """Write a revision's fields back to the post, recording it as a new revision"""
+    state = revision_state(post.pk, number)
+    for field, value in state.items():
+        setattr(post, field, value)
+    post.save()
+    return record_revision(post, author)
+
+
+def diff_table(old, new, old_label, new_label):
+    """Side-by-side HTML diff of two states, field by field"""
+    differ = HtmlDiff(wrapcolumn=80)
+    tables = []
+    for field in REVISION_FIELDS:
+        if old.get(field) == new.get(field):
+            continue
+        tables.append((field, differ.make_table(
+            (old.get(field) or '').splitlines(), (new.get(field) or '').splitlines(),
+            old_label, new_label, context=True,
+        )))
+    return tables
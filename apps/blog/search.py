@@ -0,0 +1,170 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.contrib.postgres.search import (
+    SearchHeadline, SearchQuery, SearchRank, SearchVector,
+)
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SEARCH_CONFIG = 'english'
+
+# Markers wrapped around matched terms; swapped for <mark> after escaping
+START_SEL = '\x1e'
+STOP_SEL = '\x1f'
+
+# Relative weights of each field, matching PostgreSQL's default A/B/C weights
+FIELD_WEIGHTS = {'title': 1.0, 'excerpt': 0.4, 'content': 0.2}
+
+INDEX_VERSION_KEY = 'blog:search:version'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def post_search_vector():
+    """Weighted search vector expression over title, excerpt and content"""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('excerpt', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('content', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vector(post_ids=None):
+    """Refresh the stored search vector for the given posts (all when None)"""
+    from .models import Post
+
+    if uses_postgres():
+        posts = Post.objects.all()
+        if post_ids is not None:
+            posts = posts.filter(id__in=post_ids)
+        posts.update(search_vector=post_search_vector())
+    else:
+        invalidate_fallback_index()
+
+
+def search_posts(posts, query):
+    """Return posts matching query, best first, each with rank and headline"""
+    if uses_postgres():
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        return posts.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query),
+            headline=SearchHeadline(
+                'content',
+                search_query,
+                config=SEARCH_CONFIG,
+                start_sel=START_SEL,
+                stop_sel=STOP_SEL,
+                max_words=35,
+                min_words=15,
+            ),
+        ).order_by('-rank', '-published_date')
+
+    scores = get_fallback_index().search(query)
+    # Headlines are cut from the body here, so load it even for card querysets
+    results = list(posts.filter(id__in=scores).defer(None))
+    terms = tokenize(query)
+    for post in results:
+        post.rank = scores[post.id]
+        post.headline = make_headline(post.content, terms)
+    results.sort(key=lambda post: post.rank, reverse=True)
+    return results
+
+
+def highlight(headline):
+    """Escape a headline and turn match markers into <mark> tags"""
+    return mark_safe(
+        escape(headline or '').replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+    )
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def make_headline(content, terms, max_words=35):
+    """Return a window of content around the first matched term, with markers"""
+    words = (content or '').split()
+    wanted = set(terms)
+    first = next(
+        (i for i, word in enumerate(words) if set(tokenize(word)) & wanted),
+        0,
+    )
+    start = max(0, first - max_words // 3)
+    window = words[start:start + max_words]
+    marked = [
+        f'{START_SEL}{word}{STOP_SEL}' if set(tokenize(word)) & wanted else word
+        for word in window
+    ]
+    return ' '.join(marked)
+
+
+class InvertedIndex:
+    """In-process inverted index used when the database is not PostgreSQL"""
+
+    def __init__(self, rows):
+        self.postings = defaultdict(dict)
+        self.doc_count = 0
+        for row in rows:
+            self.doc_count += 1
+            weights = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for term in tokenize(row[field]):
+                    weights[term] += weight
+            for term, weight in weights.items():
+                self.postings[term][row['id']] = weight
+
+    def search(self, query):
+        """Return {post_id: score} for posts containing every query term"""
+        terms = set(tokenize(query))
+        if not terms:
+            return {}
+        matches = None
+        for term in terms:
+            docs = self.postings.get(term, {})
+            matches = set(docs) if matches is None else matches & set(docs)
+            if not matches:
+                return {}
+        scores = {}
+        for post_id in matches:
+            score = 0.0
+            for term in terms:
+                docs = self.postings[term]
+                idf = math.log(1 + self.doc_count / len(docs))
+                score += docs[post_id] * idf
+            scores[post_id] = score
+        return scores
+
+
+_fallback_index = None
+_fallback_version = None
+
+
+def invalidate_fallback_index():
+    cache.add(INDEX_VERSION_KEY, 0, timeout=None)
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(INDEX_VERSION_KEY, 1, timeout=None)
+
+
+def get_fallback_index():
+    """Return the inverted index, rebuilding it if any post changed since"""
+    global _fallback_index, _fallback_version
+    from .models import Post
+
+    version = cache.get(INDEX_VERSION_KEY, 0)
+    if _fallback_index is None or version != _fallback_version:
+        _fallback_index = InvertedIndex(
+            Post.objects.values('id', *FIELD_WEIGHTS).iterator()
+        )
+        _fallback_version = version
+    return _fallback_index
@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Category, Tag, ArchiveMonth
+
+SIDEBAR_KEY = 'blog:sidebar'
+# Safety net for changes that bypass signals, such as flushed view counts
+SIDEBAR_TIMEOUT = 60 * 10
+# Most recent archive months listed in the sidebar
+ARCHIVE_MONTHS = 12
+
+
+def build_sidebar():
+    """Query the categories, tags and archive months shown beside post lists"""
+    published = Q(posts__status='published')
+    return {
+        'categories': list(Category.objects.annotate(post_count=Count('posts', filter=published))),
+        'tags': list(Tag.objects.annotate(post_count=Count('posts', filter=published))),
+        'archive_months': list(ArchiveMonth.objects.all()[:ARCHIVE_MONTHS]),
+    }
+
+
+def get_sidebar():
+    """Return the sidebar lists, building and caching them on a miss"""
+    sidebar = cache.get(SIDEBAR_KEY)
+    if sidebar is None:
+        sidebar = build_sidebar()
+        cache.set(SIDEBAR_KEY, sidebar, SIDEBAR_TIMEOUT)
+    return sidebar
+
+
+def published_post_count(items, obj):
+    """Look up the cached published post count of a sidebar category or tag"""
+    return next((item.post_count for item in items if item.id == obj.id), 0)
+
+
+def invalidate_sidebar():
+    cache.delete(SIDEBAR_KEY)
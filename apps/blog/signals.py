@@ -0,0 +1,101 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .api import bump_content_generation
+from .archive import archive_month_of, month_of, recount_months
+from .cards import bump_card_generation
+from .models import Post, Category, Tag, Comment, RelatedPost
+from .related import schedule_update
+from .sidebar import invalidate_sidebar
+
+# Post fields that feed the related-posts scores
+RELATED_FIELDS = {'title', 'excerpt', 'content', 'status'}
+# User fields shown as a post's or comment's author
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def post_changed(sender, **kwargs):
+    """Drop cached sidebar data when posts or their categories/tags change"""
+    invalidate_sidebar()
+    bump_content_generation()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def taxonomy_changed(sender, **kwargs):
+    """Cards show category and tag names, so renames invalidate every card"""
+    bump_card_generation()
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, update_fields=None, **kwargs):
+    """Cards, feeds and API payloads show author names; logins only save last_login"""
+    if update_fields is None or AUTHOR_FIELDS & set(update_fields):
+        bump_card_generation()
+        bump_content_generation()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, **kwargs):
+    bump_content_generation()
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, instance, action, pk_set=None, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_sidebar()
+        bump_content_generation()
+        post_ids = [instance.pk] if isinstance(instance, Post) else list(pk_set or [])
+        if post_ids:
+            # Tag links do not touch updated_date, which keys the cached cards
+            Post.objects.filter(pk__in=post_ids).update(updated_date=timezone.now())
+            schedule_update(post_ids)
+
+
+@receiver(post_save, sender=Post)
+def refresh_related_posts(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or RELATED_FIELDS & set(update_fields):
+        schedule_update([instance.id])
+
+
+@receiver(pre_delete, sender=Post)
+def refill_related_posts(sender, instance, **kwargs):
+    """Posts that listed a deleted post need a replacement neighbour"""
+    linked = list(RelatedPost.objects.filter(related=instance).values_list('post_id', flat=True))
+    if linked:
+        schedule_update(linked)
+
+
+@receiver(pre_save, sender=Post)
+def remember_archive_month(sender, instance, **kwargs):
+    """Note the month a post counted towards before this save"""
+    instance._archive_month = None
+    if instance.pk:
+        previous = Post.objects.filter(pk=instance.pk).values_list('status', 'published_date').first()
+        if previous and previous[0] == 'published' and previous[1]:
+            instance._archive_month = month_of(previous[1])
+
+
+@receiver(post_save, sender=Post)
+def update_archive_months(sender, instance, **kwargs):
+    """Recount the months a post entered or left on publish, unpublish or redate"""
+    before = getattr(instance, '_archive_month', None)
+    after = archive_month_of(instance)
+    if before != after:
+        recount_months([before, after])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_archive(sender, instance, **kwargs):
+    recount_months([archive_month_of(instance)])
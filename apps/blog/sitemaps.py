@@ -0,0 +1,22 @@
+from django.contrib.sitemaps import Sitemap
+
+from .models import Post, Category
+
+
+class PostSitemap(Sitemap):
+    changefreq = 'weekly'
+    priority = 0.8
+
+    def items(self):
+        return Post.objects.filter(status='published').only('slug', 'updated_date').order_by('-published_date')
+
+    def lastmod(self, obj):
+        return obj.updated_date
+
+
+class CategorySitemap(Sitemap):
+    changefreq = 'weekly'
+    priority = 0.5
+
+    def items(self):
+        return Category.objects.filter(posts__status='published').distinct().order_by('name')
@@ -1,3 +1,347 @@
-from django.test import TestCase
+import re
+from datetime import datetime
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .archive import rebuild_archive
+from .cards import render_cards
+from .comments import COMMENTS_PER_PAGE, MAX_DEPTH
+from .models import Post, Category, Tag, Comment, RelatedPost, ArchiveMonth
+from .pagination import keyset_page
+from .readers import REGISTERS, HyperLogLog
+from .rendering import render_post
+from .search import highlight, search_posts
+from .sidebar import get_sidebar
+from .trending import popular_posts
+
+BODY_COLUMN = re.compile(r'"blog_post"\."(content|content_html)"')
+
+
+class ListQueryColumnsTests(TestCase):
+    """List pages must not load post bodies, which can be tens of kilobytes each"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', password='secret')
+        cls.category = Category.objects.create(name='Django', slug='django')
+        cls.tag = Tag.objects.create(name='orm', slug='orm')
+        published = timezone.make_aware(datetime(2025, 3, 10))
+        cls.posts = []
+        for number in range(3):
+            post = Post.objects.create(
+                title=f'Post {number}', content='Long body text. ' * 2000, author=cls.author,
+                category=cls.category, status='published', published_date=published,
+            )
+            post.tags.add(cls.tag)
+            cls.posts.append(post)
+        RelatedPost.objects.create(post=cls.posts[0], related=cls.posts[1], score=0.5)
+
+    def assertNoBodyColumn(self, queries):
+        for query in queries:
+            self.assertIsNone(BODY_COLUMN.search(query['sql']), query['sql'])
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return context.captured_queries
+
+    def test_list_pages_defer_body(self):
+        urls = [
+            reverse('blog:post_list'),
+            reverse('blog:post_list') + '?popular=all',
+            reverse('blog:category_posts', args=[self.category.slug]),
+            reverse('blog:tag_posts', args=[self.tag.slug]),
+            reverse('blog:archive_month', args=[2025, 3]),
+            reverse('blog:feed'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNoBodyColumn(self.get(url))
+
+    def test_popular_posts_defer_body(self):
+        for mode in ('trending', 'all'):
+            with CaptureQueriesContext(connection) as context:
+                posts = popular_posts(mode)
+            self.assertTrue(posts)
+            self.assertNoBodyColumn(context.captured_queries)
+
+    def test_related_posts_defer_body(self):
+        queries = self.get(self.posts[0].get_absolute_url())
+        related = [query for query in queries if '"blog_relatedpost"' in query['sql']]
+        self.assertTrue(related)
+        self.assertNoBodyColumn(related)
+
+
+class CommentPageQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('commenter', password='secret')
+        cls.post = Post.objects.create(title='Thread', content='Body', author=cls.author, status='published')
+
+    def add_thread(self, depth, width=2):
+        """width top-level comments, each with a chain of replies depth levels deep"""
+        for _ in range(width):
+            parent = None
+            for _ in range(depth + 1):
+                parent = Comment.objects.create(post=self.post, author=self.author, content='Hi', parent=parent)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('blog:post_comments', args=[self.post.slug]), secure=True)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_comment_page_queries_are_bounded(self):
+        self.add_thread(depth=MAX_DEPTH + 2)
+        shallow = self.count_queries()
+        # Post lookup, the page, then one query per reply level
+        self.assertEqual(shallow, 2 + MAX_DEPTH)
+        self.add_thread(depth=MAX_DEPTH + 5, width=5)
+        self.assertEqual(self.count_queries(), shallow)
+
+
+class RenderPostTests(SimpleTestCase):
+    def test_plain_text_line_breaks_separate_words(self):
+        post = render_post(Post(content='one two\nthree four\nfive', content_format='text'))
+        self.assertEqual(post.word_count, 5)
+        self.assertEqual(post.excerpt, 'one two three four five')
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('writer', password='secret')
+        cls.in_title = Post.objects.create(
+            title='Django signals', content='Hooks that run on model events.',
+            author=cls.author, status='published',
+        )
+        cls.in_body = Post.objects.create(
+            title='Weekly notes', content='Mostly about <b>signals</b> in Django apps.',
+            author=cls.author, status='published',
+        )
+        Post.objects.create(title='Unrelated', content='Gardening.', author=cls.author, status='published')
+        Post.objects.create(title='Django draft', content='signals', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_title_matches_rank_first(self):
+        results = list(search_posts(Post.objects.published(), 'django signals'))
+        self.assertEqual([post.id for post in results], [self.in_title.id, self.in_body.id])
+        self.assertGreater(results[0].rank, results[1].rank)
+
+    def test_every_term_must_match(self):
+        self.assertEqual(list(search_posts(Post.objects.published(), 'django gardening')), [])
+
+    def test_headline_marks_terms_and_escapes_content(self):
+        response = self.client.get(reverse('blog:post_list'), {'query': 'signals'}, secure=True)
+        headlines = {post.id: post.headline for post in response.context['page_obj']}
+        self.assertIn('<mark>', headlines[self.in_body.id])
+        self.assertIn('&lt;b&gt;signals&lt;/b&gt;', headlines[self.in_body.id])
+        self.assertNotIn('<b>', headlines[self.in_body.id])
+
+    def test_highlight_swaps_markers(self):
+        self.assertEqual(highlight('a \x1e<b>\x1f c'), 'a <mark>&lt;b&gt;</mark> c')
+
+
+class SidebarCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('editor', password='secret')
+        cls.category = Category.objects.create(name='Python', slug='python')
+        cls.tag = Tag.objects.create(name='tips', slug='tips')
+        cls.post = Post.objects.create(
+            title='Sidebar post', content='Body', author=cls.author, category=cls.category,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self):
+        sidebar = get_sidebar()
+        return (
+            {item.slug: item.post_count for item in sidebar['categories']}.get('python'),
+            {item.slug: item.post_count for item in sidebar['tags']}.get('tips'),
+        )
+
+    def test_counts_follow_publish_tag_and_unpublish(self):
+        self.post.tags.add(self.tag)
+        self.assertEqual(self.counts(), (0, 0))
+        self.post.status = 'published'
+        self.post.save()
+        self.assertEqual(self.counts(), (1, 1))
+        self.post.tags.remove(self.tag)
+        self.assertEqual(self.counts(), (1, 0))
+        self.post.status = 'draft'
+        self.post.save()
+        self.assertEqual(self.counts(), (0, 0))
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('paginator', password='secret')
+        # Groups of posts sharing a published_date, so pages split inside ties
+        for number in range(10):
+            Post.objects.create(
+                title=f'Tied {number}', content='Body', author=author, status='published',
+                published_date=timezone.make_aware(datetime(2025, 1, 1 + number // 4)),
+            )
+
+    def test_next_and_previous_round_trip(self):
+        posts = Post.objects.published()
+        expected = list(posts.order_by('-published_date', '-id').values_list('id', flat=True))
+
+        pages = [keyset_page(posts, per_page=3)]
+        while pages[-1].has_next():
+            pages.append(keyset_page(posts, after=pages[-1].next_cursor, per_page=3))
+        self.assertEqual([post.id for page in pages for post in page], expected)
+        self.assertFalse(pages[0].has_previous())
+
+        page = pages[-1]
+        for previous in reversed(pages[:-1]):
+            page = keyset_page(posts, before=page.previous_cursor, per_page=3)
+            self.assertEqual([post.id for post in page], [post.id for post in previous])
+        self.assertFalse(page.has_previous())
+
+
+class CommentCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('reader', password='secret')
+        cls.post = Post.objects.create(title='Busy', content='Body', author=cls.author, status='published')
+        for number in range(COMMENTS_PER_PAGE * 2 + 3):
+            Comment.objects.create(
+                post=cls.post, author=cls.author, content=f'Comment {number}', is_approved=number % 5 != 4,
+            )
+        cls.parent = Comment.objects.filter(post=cls.post).first()
+        for number in range(COMMENTS_PER_PAGE + 2):
+            Comment.objects.create(post=cls.post, author=cls.author, content=f'Reply {number}', parent=cls.parent)
+
+    def walk(self, url):
+        ids, after = [], None
+        while True:
+            response = self.client.get(url, {'after': after} if after else {}, secure=True)
+            page = response.context['page']
+            ids += [comment.id for comment in page]
+            if not page.next_cursor:
+                return ids
+            after = page.next_cursor
+
+    def test_top_level_pages_cover_approved_comments_once(self):
+        expected = list(
+            Comment.objects.filter(post=self.post, parent=None, is_approved=True)
+            .order_by('id').values_list('id', flat=True)
+        )
+        self.assertEqual(self.walk(reverse('blog:post_comments', args=[self.post.slug])), expected)
+
+    def test_reply_pages_cover_every_reply_once(self):
+        expected = list(self.parent.replies.order_by('id').values_list('id', flat=True))
+        self.assertEqual(self.walk(reverse('blog:comment_replies', args=[self.parent.pk])), expected)
+
+    def test_malformed_cursor_starts_from_the_first_page(self):
+        url = reverse('blog:post_comments', args=[self.post.slug])
+        first = self.client.get(url, secure=True).context['page']
+        page = self.client.get(url, {'after': 'nonsense'}, secure=True).context['page']
+        self.assertEqual([comment.id for comment in page], [comment.id for comment in first])
+
+
+class HyperLogLogTests(SimpleTestCase):
+    # Three standard errors (1.04 / sqrt(m)), so a correct sketch stays inside
+    ERROR_BOUND = 3 * 1.04 / REGISTERS ** 0.5
+
+    def sketch(self, values):
+        sketch = HyperLogLog()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def test_estimate_within_error_bound(self):
+        for size in (100, 5000, 50000):
+            with self.subTest(size=size):
+                estimate = self.sketch(f'reader:{number}' for number in range(size)).count()
+                self.assertLessEqual(abs(estimate - size) / size, self.ERROR_BOUND)
+
+    def test_repeated_readers_count_once(self):
+        self.assertEqual(self.sketch(['a', 'b', 'a', 'b', 'a']).count(), 2)
+
+    def test_merge_and_serialization_match_the_union(self):
+        first = self.sketch(f'reader:{number}' for number in range(0, 3000))
+        second = self.sketch(f'reader:{number}' for number in range(2000, 5000))
+        union = self.sketch(f'reader:{number}' for number in range(5000))
+        merged = HyperLogLog.from_bytes(first.to_bytes()).merge(second)
+        self.assertEqual(merged.to_bytes(), union.to_bytes())
+
+
+class ArchiveMonthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('archivist', password='secret')
+        cls.march = timezone.make_aware(datetime(2025, 3, 10))
+        for _ in range(2):
+            Post.objects.create(
+                title='March', content='Body', author=cls.author, status='published', published_date=cls.march,
+            )
+
+    def counts(self):
+        return {(item.year, item.month): item.post_count for item in ArchiveMonth.objects.all()}
+
+    def test_counts_follow_redating_and_unpublishing(self):
+        post = Post.objects.first()
+        self.assertEqual(self.counts(), {(2025, 3): 2})
+        post.published_date = timezone.make_aware(datetime(2025, 5, 2))
+        post.save()
+        self.assertEqual(self.counts(), {(2025, 3): 1, (2025, 5): 1})
+        post.status = 'draft'
+        post.save()
+        self.assertEqual(self.counts(), {(2025, 3): 1})
+        Post.objects.exclude(id=post.id).delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_maintained_counts_match_a_rebuild(self):
+        post = Post.objects.first()
+        post.published_date = timezone.make_aware(datetime(2024, 12, 31, 23))
+        post.save()
+        maintained = self.counts()
+        rebuild_archive()
+        self.assertEqual(self.counts(), maintained)
+
+
+class CardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('original_name', password='secret')
+        cls.tag = Tag.objects.create(name='oldtag', slug='oldtag')
+        cls.post = Post.objects.create(title='Card', content='Body', author=cls.author, status='published')
+        cls.post.tags.add(cls.tag)
+
+    def setUp(self):
+        cache.clear()
+
+    def card(self):
+        posts = Post.objects.published().cards().select_related('author')
+        return render_cards(posts, 'blog/includes/post_card.html')[0].card_html
+
+    def test_cards_are_served_from_the_cache(self):
+        self.card()
+        with self.assertNumQueries(1):
+            self.assertIn('original_name', self.card())
+
+    def test_author_rename_rerenders_card(self):
+        self.assertIn('original_name', self.card())
+        self.author.username = 'renamed_author'
+        self.author.save()
+        self.assertIn('renamed_author', self.card())
+
+    def test_tag_rename_rerenders_card(self):
+        self.assertIn('#oldtag', self.card())
+        self.tag.name = 'newtag'
+        self.tag.save()
+        self.assertIn('#newtag', self.card())
@@ -0,0 +1,221 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+from sortedcontainers import SortedList
+
+from .models import Post, PostViewDay
+
+# Views lose half their weight every HALF_LIFE_DAYS; buckets older than
+# WINDOW_DAYS no longer count at all
+HALF_LIFE_DAYS = getattr(settings, 'BLOG_TRENDING_HALF_LIFE_DAYS', 3)
+WINDOW_DAYS = getattr(settings, 'BLOG_TRENDING_WINDOW_DAYS', 30)
+# Seconds before a worker's in-memory board is reloaded from the day buckets
+REFRESH_INTERVAL = getattr(settings, 'BLOG_TRENDING_REFRESH_INTERVAL', 300)
+POPULAR_COUNT = 5
+
+MODES = ('trending', 'all')
+REDIS_KEY = 'blog:trending:{}'
+
+logger = logging.getLogger(__name__)
+
+# Reloads stale in-memory boards off the request path
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='trending-board')
+# Day on which this process last pruned expired buckets
+_pruned_on = None
+
+
+def window_start(today=None):
+    today = today or timezone.localdate()
+    return today - timedelta(days=WINDOW_DAYS)
+
+
+def day_weight(day, epoch):
+    """Forward-decay weight of a view on day, relative to the window start.
+
+    Weights grow with time instead of old scores shrinking, so adding a view
+    never requires rescaling the rest of the board; the order is the same as
+    with scores decayed to today.
+    """
+    return 2 ** ((day - epoch).days / HALF_LIFE_DAYS)
+
+
+def decayed_scores(epoch):
+    """Return {post_id: score} from the day buckets inside the window"""
+    rows = PostViewDay.objects.filter(day__gt=epoch).values_list('post_id', 'day', 'views')
+    scores = {}
+    for post_id, day, views in rows:
+        scores[post_id] = scores.get(post_id, 0.0) + views * day_weight(day, epoch)
+    return scores
+
+
+class MemoryLeaderboard:
+    """Per-worker board kept in a SortedList of (-score, post_id).
+
+    Other workers' views reach it only through the day buckets, so it is
+    reloaded every REFRESH_INTERVAL (and at a new window start) in the
+    background while requests keep reading the current board.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._scores = {}
+        self._ranking = SortedList()
+
+    def _load(self, epoch, scores=None):
+        self._scores = decayed_scores(epoch) if scores is None else scores
+        self._ranking = SortedList((-score, post_id) for post_id, score in self._scores.items())
+        self._epoch = epoch
+        self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        """Load the board on first use; later reloads are scheduled, not awaited"""
+        epoch = window_start()
+        if self._epoch is None:
+            self._load(epoch)
+        elif not self._refreshing and (
+            epoch != self._epoch or time.monotonic() - self._loaded_at > REFRESH_INTERVAL
+        ):
+            self._refreshing = True
+            _executor.submit(self._refresh)
+
+    def _refresh(self):
+        close_old_connections()
+        try:
+            epoch = window_start()
+            scores = decayed_scores(epoch)
+            with self._lock:
+                self._load(epoch, scores)
+        except Exception:
+            logger.exception('Trending board refresh failed')
+        finally:
+            self._refreshing = False
+            connection.close()
+
+    def add(self, post_id, views=1):
+        with self._lock:
+            self._ensure_fresh()
+            old = self._scores.get(post_id)
+            if old is not None:
+                self._ranking.remove((-old, post_id))
+            new = (old or 0.0) + views * day_weight(timezone.localdate(), self._epoch)
+            self._scores[post_id] = new
+            self._ranking.add((-new, post_id))
+
+    def top(self, n):
+        with self._lock:
+            self._ensure_fresh()
+            return [post_id for _, post_id in self._ranking[:n]]
+
+    def rebuild(self):
+        with self._lock:
+            self._load(window_start())
+
+
+class RedisLeaderboard:
+    """Board shared by all workers in a Redis sorted set, one key per window start"""
+
+    def __init__(self, connection):
+        self.redis = connection
+
+    def _key(self):
+        epoch = window_start()
+        key = REDIS_KEY.format(epoch.isoformat())
+        if not self.redis.exists(key):
+            self._load(key, epoch)
+        return key, epoch
+
+    def _load(self, key, epoch):
+        scores = decayed_scores(epoch)
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        if scores:
+            pipe.zadd(key, scores)
+        pipe.expire(key, 60 * 60 * 48)
+        pipe.execute()
+
+    def add(self, post_id, views=1):
+        key, epoch = self._key()
+        self.redis.zincrby(key, views * day_weight(timezone.localdate(), epoch), post_id)
+
+    def top(self, n):
+        key, _ = self._key()
+        return [int(post_id) for post_id in self.redis.zrevrange(key, 0, n - 1)]
+
+    def rebuild(self):
+        epoch = window_start()
+        self._load(REDIS_KEY.format(epoch.isoformat()), epoch)
+
+
+_board = None
+_board_lock = threading.Lock()
+
+
+def get_leaderboard():
+    """Redis-backed board when the cache is django-redis, else a per-worker one"""
+    global _board
+    with _board_lock:
+        if _board is None:
+            backend = settings.CACHES['default']['BACKEND']
+            if backend.startswith('django_redis'):
+                from django_redis import get_redis_connection
+                _board = RedisLeaderboard(get_redis_connection('default'))
+            else:
+                _board = MemoryLeaderboard()
+        return _board
+
+
+def record_trending_view(post_id):
+    get_leaderboard().add(post_id)
+
+
+def record_day_views(counts, day=None):
+    """Add flushed hits {post_id: count} to the day buckets, one UPDATE per count.
+
+    The first flush of each day in a process also prunes expired buckets.
+    """
+    global _pruned_on
+    day = day or timezone.localdate()
+    if _pruned_on != day:
+        prune_view_days()
+        _pruned_on = day
+    PostViewDay.objects.bulk_create(
+        [PostViewDay(post_id=post_id, day=day) for post_id in counts],
+        ignore_conflicts=True,
+    )
+    by_increment = {}
+    for post_id, count in counts.items():
+        by_increment.setdefault(count, []).append(post_id)
+    for increment, ids in by_increment.items():
+        PostViewDay.objects.filter(post_id__in=ids, day=day).update(views=F('views') + increment)
+
+
+def popular_posts(mode='trending', n=POPULAR_COUNT):
+    """Top published posts by decayed recent views, or by all-time views"""
+    published = Post.objects.published().cards()
+    if mode == 'all':
+        return list(published.order_by('-views')[:n])
+
+    # Over-fetch ids so unpublished or deleted posts on the board can be skipped
+    ids = get_leaderboard().top(n * 2)
+    by_id = published.in_bulk(ids)
+    posts = [by_id[post_id] for post_id in ids if post_id in by_id][:n]
+    if not posts:
+        # Nothing viewed inside the window yet
+        return list(published.order_by('-views')[:n])
+    return posts
+
+
+def prune_view_days():
+    """Delete day buckets that have fallen out of the window"""
+    deleted, _ = PostViewDay.objects.filter(day__lte=window_start()).delete()
+    return deleted
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, feeds, api
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -7,12 +7,33 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.post_list, name='post_list'),
+    path('feed/', feeds.latest_posts_rss, name='feed'),
+    path('feed/atom/', feeds.latest_posts_atom, name='feed_atom'),
     path('post/new/', views.post_create, name='post_create'),
+    path('post/new/autosave/', views.post_autosave, name='post_autosave_new'),
+    path('post/new/draft/discard/', views.post_discard_draft, name='post_discard_draft_new'),
     path('post/<slug:slug>/', views.post_detail, name='post_detail'),
+    path('post/<slug:slug>/comments/', views.post_comments, name='post_comments'),
     path('post/<slug:slug>/edit/', views.post_update, name='post_update'),
+    path('post/<slug:slug>/autosave/', views.post_autosave, name='post_autosave'),
+    path('post/<slug:slug>/draft/discard/', views.post_discard_draft, name='post_discard_draft'),
     path('post/<slug:slug>/delete/', views.post_delete, name='post_delete'),
     path('category/<slug:slug>/', views.category_posts, name='category_posts'),
+    path('category/<slug:slug>/feed/', feeds.category_rss, name='category_feed'),
+    path('category/<slug:slug>/feed/atom/', feeds.category_atom, name='category_feed_atom'),
     path('tag/<slug:slug>/', views.tag_posts, name='tag_posts'),
+    path('tag/<slug:slug>/feed/', feeds.tag_rss, name='tag_feed'),
+    path('tag/<slug:slug>/feed/atom/', feeds.tag_atom, name='tag_feed_atom'),
+    path('archive/', views.archive, name='archive'),
+    path('archive/<int:year>/', views.archive, name='archive_year'),
+    path('archive/<int:year>/<int:month>/', views.archive_month, name='archive_month'),
+    # Read-only JSON API
+    path('api/v1/posts/', api.post_list, name='api_post_list'),
+    path('api/v1/posts/<slug:slug>/', api.post_detail, name='api_post_detail'),
+    path('api/v1/posts/<slug:slug>/comments/', api.post_comments, name='api_post_comments'),
+    path('api/v1/categories/', api.category_list, name='api_category_list'),
+    path('api/v1/tags/', api.tag_list, name='api_tag_list'),
+    path('comment/<int:pk>/replies/', views.comment_replies, name='comment_replies'),
     path('comment/<int:pk>/delete/', views.comment_delete, name='comment_delete'),
 ]
 
@@ -1,52 +1,69 @@
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Count, Q
 from django.utils import timezone
-from .models import Post, Category, Tag, Comment
+from .models import Post, Category, Tag, Comment, RelatedPost, ArchiveMonth, CARD_DEFERRED_FIELDS
 from .forms import PostForm, CommentForm, PostSearchForm
+from .search import search_posts, highlight
+from .sidebar import get_sidebar, published_post_count
+from .readers import record_reader, visitor_id
+from .trending import MODES as POPULAR_MODES, popular_posts
+from .pagination import paginate_posts
+from .comments import load_comment_page, parse_cursor
+from .archive import archive_years, month_bounds, posts_in_month
+from .cards import render_cards
+from .revisions import ensure_initial_revision, record_revision
+from .drafts import autosave, discard_draft, pending_draft
 
 def post_list(request):
     """Display list of published posts with search and filtering"""
-    posts = Post.objects.filter(status='published').select_related('author', 'category').prefetch_related('tags')
+    posts = Post.objects.published().cards().select_related('author', 'category')
     
     # Search functionality
+    query = None
     search_form = PostSearchForm(request.GET)
     if search_form.is_valid():
         query = search_form.cleaned_data.get('query')
         category = search_form.cleaned_data.get('category')
         
-        if query:
-            posts = posts.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(excerpt__icontains=query)
-            )
-        
         if category:
             posts = posts.filter(category=category)
+        
+        if query:
+            # Ranked full-text results, best match first
+            posts = search_posts(posts, query)
     
-    # Pagination
-    paginator = Paginator(posts, 6)  # 6 posts per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Get popular posts (most viewed)
-    popular_posts = Post.objects.filter(status='published').order_by('-views')[:5]
+    # Pagination: ranked search results use page numbers, the feed uses cursors
+    if query:
+        paginator = Paginator(posts, 6)  # 6 posts per page
+        page_obj = paginator.get_page(request.GET.get('page'))
+    else:
+        page_obj = paginate_posts(request, posts)
     
-    # Get all categories with post count
-    categories = Category.objects.annotate(post_count=Count('posts', filter=Q(posts__status='published')))
+    if query:
+        for post in page_obj:
+            post.headline = highlight(post.headline)
+    # Cached card fragments; tags are only prefetched for cards not cached yet
+    render_cards(page_obj, 'blog/includes/post_card.html')
     
-    # Get all tags
-    tags = Tag.objects.annotate(post_count=Count('posts', filter=Q(posts__status='published')))
+    # Trending by decayed recent views, or all-time with ?popular=all
+    popular_mode = request.GET.get('popular')
+    if popular_mode not in POPULAR_MODES:
+        popular_mode = 'trending'
     
     context = {
         'page_obj': page_obj,
         'search_form': search_form,
-        'popular_posts': popular_posts,
-        'categories': categories,
-        'tags': tags,
+        'query': query,
+        'popular_mode': popular_mode,
+        'popular_posts': popular_posts(popular_mode),
+        # Categories and tags with post counts (cached)
+        **get_sidebar(),
     }
     return render(request, 'blog/post_list.html', context)
 
@@ -55,22 +72,19 @@ def post_detail(request, slug):
     """Display single post with comments"""
 
     # Superusers can see all posts; others only published
+    posts = Post.objects.select_related('author', 'category').prefetch_related('tags').annotate(
+        comment_count=Count('comments', filter=Q(comments__is_approved=True))
+    )
     if request.user.is_superuser:
-        post = get_object_or_404(
-            Post.objects.select_related('author', 'category').prefetch_related('tags', 'comments'),
-            slug=slug
-        )
+        post = get_object_or_404(posts, slug=slug)
     else:
-        post = get_object_or_404(
-            Post.objects.select_related('author', 'category').prefetch_related('tags', 'comments'),
-            slug=slug,
-        )
+        post = get_object_or_404(posts, slug=slug)
     
-    # Increment view count
+    # Buffer the hit; views shown include those not yet flushed
     post.increment_views()
-    
-    # Get approved comments
-    comments = post.comments.filter(is_approved=True, parent=None).select_related('author').prefetch_related('replies')
+    visitor = visitor_id(request)
+    if visitor:
+        record_reader(post.id, visitor)
     
     # Handle comment form submission
     if request.method == 'POST':
@@ -84,7 +98,7 @@ def post_detail(request, slug):
                 # Handle reply to comment
                 parent_id = request.POST.get('parent_id')
                 if parent_id:
-                    comment.parent = get_object_or_404(Comment, id=parent_id)
+                    comment.parent = get_object_or_404(Comment, id=parent_id, post=post)
                 
                 comment.save()
                 messages.success(request, 'Comment posted successfully!')
@@ -95,15 +109,21 @@ def post_detail(request, slug):
     else:
         comment_form = CommentForm()
     
-    # Get related posts
-    related_posts = Post.objects.filter(
-        category=post.category,
-        status='published'
-    ).exclude(id=post.id)[:3]
+    # First page of comments; later pages and deep replies load on demand
+    comments = load_comment_page(post.comments.filter(parent=None))
+    
+    # Precomputed neighbours by tag overlap and text similarity
+    related_posts = [
+        link.related for link in
+        RelatedPost.objects.filter(post=post, related__status='published').select_related('related').defer(
+            *(f'related__{field}' for field in CARD_DEFERRED_FIELDS)
+        )[:3]
+    ]
     
     context = {
         'post': post,
         'comments': comments,
+        'comment_count': post.comment_count,
         'comment_form': comment_form,
         'related_posts': related_posts,
     }
@@ -111,6 +131,39 @@ def post_detail(request, slug):
 
 
 
+def post_comments(request, slug):
+    """Render the next page of top-level comments as an HTML fragment"""
+    post = get_object_or_404(Post.objects.only('id', 'slug'), slug=slug)
+    page = load_comment_page(
+        post.comments.filter(parent=None),
+        after=parse_cursor(request.GET.get('after')),
+    )
+    context = {
+        'post': post,
+        'page': page,
+    }
+    return render(request, 'blog/includes/comment_page.html', context)
+
+
+def comment_replies(request, pk):
+    """Render the next page of replies to a comment as an HTML fragment"""
+    parent = get_object_or_404(
+        Comment.objects.select_related('post').only('id', 'post__id', 'post__slug'),
+        pk=pk,
+        is_approved=True,
+    )
+    page = load_comment_page(
+        parent.replies.all(),
+        after=parse_cursor(request.GET.get('after')),
+    )
+    context = {
+        'post': parent.post,
+        'parent': parent,
+        'page': page,
+    }
+    return render(request, 'blog/includes/comment_page.html', context)
+
+
 @login_required
 def post_create(request):
     """Create new blog post"""
@@ -121,6 +174,8 @@ def post_create(request):
             post.author = request.user
             post.save()
             form.save_m2m()  # Save many-to-many relationships (tags)
+            record_revision(post, request.user)
+            discard_draft(request.user)
             messages.success(request, f'Post "{post.title}" created successfully!')
             return redirect('blog:post_detail', slug=post.slug)
     else:
@@ -128,7 +183,10 @@ def post_create(request):
     
     context = {
         'form': form,
-        'title': 'Create New Post'
+        'title': 'Create New Post',
+        'draft': pending_draft(request.user),
+        'autosave_url': reverse('blog:post_autosave_new'),
+        'discard_draft_url': reverse('blog:post_discard_draft_new'),
     }
     return render(request, 'blog/post_form.html', context)
 
@@ -146,7 +204,11 @@ def post_update(request, slug):
     if request.method == 'POST':
         form = PostForm(request.POST, request.FILES, instance=post)
         if form.is_valid():
+            # Keep the stored version being replaced if the post predates revision history
+            ensure_initial_revision(post)
             form.save()
+            record_revision(post, request.user)
+            discard_draft(request.user, post)
             messages.success(request, f'Post "{post.title}" updated successfully!')
             return redirect('blog:post_detail', slug=post.slug)
     else:
@@ -155,11 +217,48 @@ def post_update(request, slug):
     context = {
         'form': form,
         'post': post,
-        'title': 'Edit Post'
+        'title': 'Edit Post',
+        'draft': pending_draft(request.user, post),
+        'autosave_url': reverse('blog:post_autosave', args=[post.slug]),
+        'discard_draft_url': reverse('blog:post_discard_draft', args=[post.slug]),
     }
     return render(request, 'blog/post_form.html', context)
 
 
+def editable_post(request, slug):
+    """(post, error response) for the draft endpoints; post is None for a new post"""
+    if slug is None:
+        return None, None
+    post = get_object_or_404(Post.objects.only('id', 'author_id'), slug=slug)
+    if post.author_id != request.user.id and not request.user.is_staff:
+        return post, JsonResponse({'error': 'You do not have permission to edit this post.'}, status=403)
+    return post, None
+
+
+@login_required
+@require_POST
+def post_autosave(request, slug=None):
+    """Store the editor's draft without saving the post (see blog.drafts)"""
+    post, denied = editable_post(request, slug)
+    if denied:
+        return denied
+    
+    draft, persisted = autosave(request.user, post, request.POST, final=request.POST.get('final') == '1')
+    return JsonResponse({'saved_at': draft['saved_at'], 'persisted': persisted})
+
+
+@login_required
+@require_POST
+def post_discard_draft(request, slug=None):
+    """Delete the autosaved draft the author chose not to restore"""
+    post, denied = editable_post(request, slug)
+    if denied:
+        return denied
+    
+    discard_draft(request.user, post)
+    return JsonResponse({'discarded': True})
+
+
 @login_required
 def post_delete(request, slug):
     """Delete blog post"""
@@ -185,15 +284,15 @@ def post_delete(request, slug):
 def category_posts(request, slug):
     """Display posts in a specific category"""
     category = get_object_or_404(Category, slug=slug)
-    posts = Post.objects.filter(category=category, status='published').select_related('author')
+    posts = Post.objects.published().cards().filter(category=category).select_related('author')
     
-    paginator = Paginator(posts, 6)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate_posts(request, posts)
+    render_cards(page_obj, 'blog/includes/category_post_card.html', prefetch=())
     
     context = {
         'category': category,
         'page_obj': page_obj,
+        'post_count': published_post_count(get_sidebar()['categories'], category),
     }
     return render(request, 'blog/category_posts.html', context)
 
@@ -201,19 +300,56 @@ def category_posts(request, slug):
 def tag_posts(request, slug):
     """Display posts with a specific tag"""
     tag = get_object_or_404(Tag, slug=slug)
-    posts = Post.objects.filter(tags=tag, status='published').select_related('author')
+    posts = Post.objects.published().cards().filter(tags=tag).select_related('author', 'category')
     
-    paginator = Paginator(posts, 6)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate_posts(request, posts)
+    render_cards(page_obj, 'blog/includes/tag_post_card.html', prefetch=())
     
     context = {
         'tag': tag,
         'page_obj': page_obj,
+        'post_count': published_post_count(get_sidebar()['tags'], tag),
     }
     return render(request, 'blog/tag_posts.html', context)
 
 
+def archive(request, year=None):
+    """List archive months grouped by year, from the precomputed rollup"""
+    months = ArchiveMonth.objects.all()
+    if year is not None:
+        months = months.filter(year=year)
+    years = archive_years(months)
+    if year is not None and not years:
+        raise Http404('No posts published in this year')
+    
+    context = {
+        'years': years,
+        'year': year,
+    }
+    return render(request, 'blog/archive.html', context)
+
+
+def archive_month(request, year, month):
+    """Display posts published in one month, using a published_date range"""
+    if not 1 <= month <= 12:
+        raise Http404('Invalid month')
+    entry = get_object_or_404(ArchiveMonth, year=year, month=month)
+    posts = posts_in_month(
+        Post.objects.published().cards().select_related('author'), year, month
+    )
+    
+    page_obj = paginate_posts(request, posts)
+    render_cards(page_obj, 'blog/includes/category_post_card.html', prefetch=())
+    
+    context = {
+        'month_start': month_bounds(year, month)[0],
+        'year': year,
+        'page_obj': page_obj,
+        'post_count': entry.post_count,
+    }
+    return render(request, 'blog/archive_month.html', context)
+
+
 @login_required
 def comment_delete(request, pk):
     """Delete a comment"""
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class PortfolioSiteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.portfolio_site'
-    verbose_name = 'Portfolio Site'
\ No newline at end of file
+    verbose_name = 'Portfolio Site'
+
+    def ready(self):
+        from . import signals  # noqa: F401
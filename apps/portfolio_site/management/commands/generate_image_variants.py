@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import Post
+from apps.portfolio_site.models import Project
+from my_portfolio.images import update_variants, write_static_variants
+
+# Static images shown through {% responsive_static %}
+STATIC_IMAGES = ['images/profile.jpeg']
+
+
+class Command(BaseCommand):
+    help = 'Regenerate resized WebP/JPEG variants for uploaded and static images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--static-only', action='store_true', help='Only process static images')
+
+    def handle(self, *args, **options):
+        for relative in STATIC_IMAGES:
+            for directory in settings.STATICFILES_DIRS:
+                source = directory / relative
+                if source.exists():
+                    written = write_static_variants(source)
+                    self.stdout.write(f'{relative}: {len(written)} variant(s)')
+
+        if options['static_only']:
+            return
+
+        targets = [
+            (Post.objects.exclude(featured_image='').exclude(featured_image=None), 'featured_image', 'featured_image_variants'),
+            (Project.objects.exclude(image='').exclude(image=None), 'image', 'image_variants'),
+        ]
+        for queryset, image_field, variants_field in targets:
+            for instance in queryset.only('id', 'title', image_field, variants_field).iterator():
+                try:
+                    update_variants(instance, image_field, variants_field)
+                except Exception as e:
+                    self.stderr.write(f'{instance}: {e}')
+                    continue
+                self.stdout.write(f'{instance}: variants regenerated')
+
+        self.stdout.write(self.style.SUCCESS('Image variants generated.'))
@@ -0,0 +1,17 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Retry uploads of media files still waiting in the local staging directory'
+
+    def handle(self, *args, **options):
+        names = default_storage.staged_names()
+        failed = 0
+        for name in names:
+            try:
+                default_storage.upload_staged(name)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'{name}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'Uploaded {len(names) - failed} of {len(names)} staged file(s).'))
@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from my_portfolio.images import schedule_variants
 
 class Skill(models.Model):
     """Model for skills/technologies"""
@@ -46,6 +47,8 @@ class Project(models.Model):
         null=True,
         help_text="Project screenshot or thumbnail"
     )
+    # Resized WebP/JPEG derivatives; see my_portfolio.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     technologies = models.ManyToManyField(
         Skill,
         related_name='projects',
@@ -64,6 +67,10 @@ class Project(models.Model):
     class Meta:
         ordering = ['-is_featured', 'order', '-created_date']
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        schedule_variants(self, 'image', 'image_variants')
+    
     def __str__(self):
         return self.title
 
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from my_portfolio.syndication import bump_generation
+
+from .models import Project
+from .sitemaps import PROJECTS_KEY
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, **kwargs):
+    bump_generation(PROJECTS_KEY)
@@ -0,0 +1,39 @@
+from django.contrib.sitemaps import Sitemap
+from django.urls import reverse
+
+from .models import Project
+
+# Generation counter bumped on project changes, which versions the cached sitemap
+PROJECTS_KEY = 'portfolio:projects:generation'
+
+
+class ProjectSitemap(Sitemap):
+    changefreq = 'monthly'
+    priority = 0.7
+
+    def items(self):
+        return Project.objects.only('id', 'updated_date').order_by('id')
+
+    def location(self, obj):
+        return reverse('portfolio_site:project_detail', args=[obj.pk])
+
+    def lastmod(self, obj):
+        return obj.updated_date
+
+
+class StaticViewSitemap(Sitemap):
+    """Public pages that are not backed by a model"""
+    changefreq = 'monthly'
+    priority = 0.6
+
+    def items(self):
+        return [
+            'portfolio_site:index',
+            'portfolio_site:projects',
+            'portfolio_site:contact',
+            'blog:post_list',
+            'weather:index',
+        ]
+
+    def location(self, item):
+        return reverse(item)
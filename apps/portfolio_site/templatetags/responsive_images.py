@@ -0,0 +1,58 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from my_portfolio.images import VARIANT_FORMATS, variant_name
+
+register = template.Library()
+
+
+def render_picture(src, srcsets, alt, sizes, attrs):
+    """<picture> with a WebP source and a JPEG <img> fallback"""
+    sources = format_html_join(
+        '', '<source type="image/webp" srcset="{}" sizes="{}">',
+        [(srcsets['webp'], sizes)] if srcsets.get('webp') else [],
+    )
+    return format_html(
+        '<picture>{}<img src="{}"{} sizes="{}" alt="{}"{}></picture>',
+        sources,
+        src,
+        format_html(' srcset="{}"', srcsets['jpeg']) if srcsets.get('jpeg') else '',
+        sizes,
+        alt,
+        format_html_join('', ' {}="{}"', attrs.items()),
+    )
+
+
+@register.simple_tag
+def responsive_image(image, variants, alt='', sizes='100vw', **attrs):
+    """Render an uploaded image with srcset candidates from its recorded variants.
+
+    Usage: {% responsive_image post.featured_image post.featured_image_variants alt=post.title sizes="(min-width: 992px) 50vw, 100vw" class="card-img-top" %}
+    Falls back to a plain <img> until the variants have been generated.
+    """
+    if not image:
+        return ''
+    storage = image.storage
+    srcsets = {}
+    if variants and variants.get('source') == image.name:
+        for key in VARIANT_FORMATS:
+            candidates = sorted(variants.get(key, {}).items(), key=lambda item: int(item[0]))
+            srcsets[key] = ', '.join(f'{storage.url(name)} {width}w' for width, name in candidates)
+    return render_picture(image.url, srcsets, alt, sizes, attrs)
+
+
+@register.simple_tag
+def responsive_static(path, widths, alt='', sizes='100vw', **attrs):
+    """Render a static image with the derivatives written by generate_image_variants.
+
+    Usage: {% responsive_static 'images/profile.jpeg' '320 640' alt="Profile" sizes="300px" %}
+    """
+    srcsets = {
+        key: ', '.join(
+            f'{static(variant_name(path, width, extension))} {width}w'
+            for width in widths.split()
+        )
+        for key, (_, extension, _) in VARIANT_FORMATS.items()
+    }
+    return render_picture(static(path), srcsets, alt, sizes, attrs)
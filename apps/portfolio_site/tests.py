@@ -1,3 +1,56 @@
-from django.test import TestCase
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from my_portfolio import storage as storage_module
+from my_portfolio.storage import SupabaseStorage
+
+
+class SupabaseStorageTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        settings = override_settings(
+            SUPABASE_STORAGE_LOCAL_ROOT=str(self.root / 'bucket'), MEDIA_ROOT=str(self.root / 'media'),
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Hold uploads back so the staged state can be checked first
+        submit = mock.patch.object(storage_module._executor, 'submit')
+        self.submit = submit.start()
+        self.addCleanup(submit.stop)
+        self.storage = SupabaseStorage()
+
+    def test_saved_file_is_staged_until_uploaded(self):
+        name = self.storage.save('blog/images/photo.jpg', ContentFile(b'image bytes'))
+        self.submit.assert_called_once_with(self.storage._upload_in_background, name)
+        self.assertEqual(self.storage.staged_names(), [name])
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), len(b'image bytes'))
+        self.assertFalse((self.root / 'bucket' / name).exists())
+
+        self.storage.upload_staged(name)
+        self.assertEqual(self.storage.staged_names(), [])
+        self.assertEqual((self.root / 'bucket' / name).read_bytes(), b'image bytes')
+        with self.storage.open(name) as uploaded:
+            self.assertEqual(uploaded.read(), b'image bytes')
+
+    def test_overwrite_keeps_the_name(self):
+        name = self.storage.save('variants/a-320w.webp', ContentFile(b'old'))
+        self.storage.upload_staged(name)
+        self.assertEqual(self.storage.overwrite(name, ContentFile(b'new')), name)
+        self.storage.upload_staged(name)
+        self.assertEqual((self.root / 'bucket' / name).read_bytes(), b'new')
+
+    def test_delete_removes_staged_and_uploaded_copies(self):
+        name = self.storage.save('blog/images/gone.jpg', ContentFile(b'x'))
+        self.storage.upload_staged(name)
+        other = self.storage.save('blog/images/pending.jpg', ContentFile(b'y'))
+        self.storage.delete(name)
+        self.storage.delete(other)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(self.storage.exists(other))
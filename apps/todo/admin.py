@@ -31,16 +31,16 @@ class TaskAdmin(admin.ModelAdmin):
     actions = ['mark_completed', 'mark_in_progress', 'mark_todo']
     
     def mark_completed(self, request, queryset):
-        updated = queryset.update(status='completed')
+        updated = queryset.set_status('completed')
         self.message_user(request, f'{updated} task(s) marked as completed.')
     mark_completed.short_description = 'Mark selected tasks as completed'
     
     def mark_in_progress(self, request, queryset):
-        updated = queryset.update(status='in_progress')
+        updated = queryset.set_status('in_progress')
         self.message_user(request, f'{updated} task(s) marked as in progress.')
     mark_in_progress.short_description = 'Mark selected tasks as in progress'
     
     def mark_todo(self, request, queryset):
-        updated = queryset.update(status='todo')
+        updated = queryset.set_status('todo')
         self.message_user(request, f'{updated} task(s) marked as to do.')
     mark_todo.short_description = 'Mark selected tasks as to do'
\ No newline at end of file
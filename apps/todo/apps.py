@@ -4,4 +4,9 @@ from django.apps import AppConfig
 class TodoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.todo'
-    verbose_name = 'Todo'
\ No newline at end of file
+    verbose_name = 'Todo'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .search import set_trigram_threshold
+        connection_created.connect(set_trigram_threshold)
@@ -61,6 +61,11 @@ class TaskFilterForm(forms.Form):
             'class': 'form-control'
         })
     )
+    fuzzy = forms.BooleanField(
+        required=False,
+        label='Typo-tolerant',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
     status = forms.ChoiceField(
         required=False,
         choices=STATUS_CHOICES,
@@ -80,4 +85,51 @@ class TaskFilterForm(forms.Form):
             ('title', 'Title (A-Z)'),
         ],
         widget=forms.Select(attrs={'class': 'form-select'})
-    )
\ No newline at end of file
+    )
+
+class TaskBulkForm(forms.Form):
+    """Form for applying one change to many selected tasks"""
+    ACTION_CHOICES = [
+        ('status', 'Change status'),
+        ('priority', 'Change priority'),
+        ('due_date', 'Change due date'),
+        ('delete', 'Delete'),
+    ]
+    
+    task_ids = forms.Field(widget=forms.MultipleHiddenInput)
+    action = forms.ChoiceField(
+        choices=ACTION_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    status = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Status...')] + list(Task.STATUS_CHOICES),
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    priority = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Priority...')] + list(Task.PRIORITY_CHOICES),
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    due_date = forms.DateTimeField(
+        required=False,
+        widget=forms.DateTimeInput(attrs={
+            'type': 'datetime-local',
+            'class': 'form-control'
+        }),
+        help_text="Leave empty to clear the deadline"
+    )
+    
+    def clean_task_ids(self):
+        try:
+            task_ids = {int(task_id) for task_id in self.cleaned_data['task_ids']}
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Invalid task selection.')
+        return task_ids
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        if action in ('status', 'priority') and not cleaned_data.get(action):
+            self.add_error(action, 'Choose a new value.')
+        return cleaned_data
@@ -0,0 +1,59 @@
+# Generated by Django 6.0.1 on 2026-10-17 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+PRIORITY_RANKS = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+STATUS_RANKS = {'in_progress': 0, 'todo': 1, 'completed': 2}
+
+
+def populate_ranks(apps, schema_editor):
+    Task = apps.get_model('todo', 'Task')
+    Task.objects.update(
+        priority_rank=models.Case(
+            *[models.When(priority=key, then=models.Value(rank)) for key, rank in PRIORITY_RANKS.items()],
+            default=models.Value(PRIORITY_RANKS['medium']),
+        ),
+        status_rank=models.Case(
+            *[models.When(status=key, then=models.Value(rank)) for key, rank in STATUS_RANKS.items()],
+            default=models.Value(STATUS_RANKS['todo']),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0002_alter_task_options_remove_task_completed_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=2, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status_rank',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.RunPython(populate_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status_rank', 'priority_rank', 'due_date'], name='todo_task_user_id_187bd3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date'], name='todo_task_user_id_b659c7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'title'], name='todo_task_user_id_97ef73_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-created_date'], name='todo_task_user_id_d4da4d_idx'),
+        ),
+    ]
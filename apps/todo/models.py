@@ -1,8 +1,123 @@
+from datetime import timedelta
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import Coalesce, Substr, Upper
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.urls import reverse
 
+# Characters of the description loaded for task cards
+DESCRIPTION_PREVIEW_LENGTH = 300
+
+# Stored sort keys: most urgent first, and open tasks before completed ones
+PRIORITY_RANKS = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+STATUS_RANKS = {'in_progress': 0, 'todo': 1, 'completed': 2}
+
+# TaskFilterForm.sort_by -> (field, descending) keys; each ordering is served
+# by one of Task's (user, ...) indexes, and id makes it total for cursors
+SORT_KEYS = {
+    '': (('created_date', True), ('id', True)),
+    'due_date': (('due_date', False), ('id', False)),
+    'priority': (('status_rank', False), ('priority_rank', False), ('due_date', False), ('id', False)),
+    'title': (('title', False), ('id', False)),
+    # Searches without an explicit sort; rank is annotated by search_tasks()
+    'relevance': (('rank', True), ('id', True)),
+}
+
+
+def sort_keys(sort_by):
+    return SORT_KEYS.get(sort_by or '', SORT_KEYS[''])
+
+
+def is_nullable(model, name):
+    """Whether a sort key is a nullable column (annotations never are)"""
+    try:
+        return model._meta.get_field(name).null
+    except FieldDoesNotExist:
+        return False
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_due_flags(self, now=None):
+        """Annotate overdue and due_soon (within 24 hours) in SQL"""
+        now = now or timezone.now()
+        open_task = ~Q(status='completed')
+        return self.annotate(
+            overdue=Case(
+                When(open_task & Q(due_date__lt=now), then=Value(True)),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+            due_soon=Case(
+                When(
+                    open_task & Q(due_date__gt=now, due_date__lte=now + timedelta(hours=24)),
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            ),
+        )
+    
+    def sorted_by(self, sort_by):
+        """Order by a TaskFilterForm.sort_by option; tasks without a due date go last"""
+        ordering = []
+        for name, descending in sort_keys(sort_by):
+            if is_nullable(self.model, name):
+                ordering.append(F(name).asc(nulls_last=True))
+            else:
+                ordering.append(f'-{name}' if descending else name)
+        return self.order_by(*ordering)
+    
+    def stats(self, now=None):
+        """Total, completed, pending, overdue and per priority/status counts in one query"""
+        now = now or timezone.now()
+        completed = Q(status='completed')
+        return self.aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=completed),
+            pending=Count('id', filter=~completed),
+            overdue=Count('id', filter=~completed & Q(due_date__lt=now)),
+            **{f'priority_{key}': Count('id', filter=Q(priority=key)) for key, _ in Task.PRIORITY_CHOICES},
+            **{f'status_{key}': Count('id', filter=Q(status=key)) for key, _ in Task.STATUS_CHOICES},
+        )
+    
+    def set_status(self, status, now=None):
+        """Change status in one UPDATE, keeping status_rank and completed_date consistent.
+
+        Tasks that were already completed keep their original completed_date.
+        """
+        now = now or timezone.now()
+        if status == 'completed':
+            completed_date = Coalesce('completed_date', Value(now))
+        else:
+            completed_date = Value(None, output_field=models.DateTimeField())
+        return self.update(
+            status=status,
+            status_rank=STATUS_RANKS[status],
+            completed_date=completed_date,
+            updated_date=now,
+        )
+    
+    def set_priority(self, priority, now=None):
+        return self.update(
+            priority=priority,
+            priority_rank=PRIORITY_RANKS[priority],
+            updated_date=now or timezone.now(),
+        )
+    
+    def set_due_date(self, due_date, now=None):
+        return self.update(due_date=due_date, updated_date=now or timezone.now())
+    
+    def cards(self):
+        """Tasks for lists, with a short description preview instead of the full text"""
+        return self.defer('description').annotate(
+            description_preview=Substr('description', 1, DESCRIPTION_PREVIEW_LENGTH)
+        )
+
+
 class Task(models.Model):
     """Task model for todo items"""
     PRIORITY_CHOICES = [
@@ -18,6 +133,19 @@ class Task(models.Model):
         ('completed', 'Completed'),
     ]
     
+    # Bootstrap colour of each priority and status badge
+    PRIORITY_CLASSES = {
+        'low': 'secondary',
+        'medium': 'info',
+        'high': 'warning',
+        'urgent': 'danger',
+    }
+    STATUS_CLASSES = {
+        'todo': 'secondary',
+        'in_progress': 'primary',
+        'completed': 'success',
+    }
+    
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, help_text="Optional task details")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks')
@@ -39,17 +167,37 @@ class Task(models.Model):
     completed_date = models.DateTimeField(null=True, blank=True)
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
+    # Integer copies of priority and status for index-ordered sorting
+    priority_rank = models.PositiveSmallIntegerField(default=PRIORITY_RANKS['medium'], editable=False)
+    status_rank = models.PositiveSmallIntegerField(default=STATUS_RANKS['todo'], editable=False)
+    
+    objects = TaskQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_date']
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['due_date']),
+            models.Index(fields=['user', 'status_rank', 'priority_rank', 'due_date']),
+            models.Index(fields=['user', 'due_date']),
+            models.Index(fields=['user', 'title']),
+            models.Index(fields=['user', '-created_date']),
+            # Trigram indexes for search_tasks(), on the UPPER() both its modes filter on
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='todo_task_title_trgm'),
+            GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='todo_task_description_trgm'),
         ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        self.priority_rank = PRIORITY_RANKS.get(self.priority, PRIORITY_RANKS['medium'])
+        self.status_rank = STATUS_RANKS.get(self.status, STATUS_RANKS['todo'])
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'priority_rank', 'status_rank'}
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('todo:task_detail', kwargs={'pk': self.pk})
     
@@ -83,20 +231,9 @@ class Task(models.Model):
     @property
     def priority_class(self):
         """Return Bootstrap class based on priority"""
-        priority_classes = {
-            'low': 'secondary',
-            'medium': 'info',
-            'high': 'warning',
-            'urgent': 'danger',
-        }
-        return priority_classes.get(self.priority, 'secondary')
+        return self.PRIORITY_CLASSES.get(self.priority, 'secondary')
     
     @property
     def status_class(self):
         """Return Bootstrap class based on status"""
-        status_classes = {
-            'todo': 'secondary',
-            'in_progress': 'primary',
-            'completed': 'success',
-        }
-        return status_classes.get(self.status, 'secondary')
\ No newline at end of file
+        return self.STATUS_CLASSES.get(self.status, 'secondary')
\ No newline at end of file
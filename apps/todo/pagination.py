@@ -0,0 +1,100 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+from .models import is_nullable, sort_keys
+
+TASKS_PER_PAGE = 24
+
+
+def encode_cursor(task, keys):
+    """Encode the sort key values of the last task on a page"""
+    values = []
+    for name, _ in keys:
+        value = getattr(task, name)
+        if value is not None and not isinstance(value, float):
+            value = task._meta.get_field(name).value_to_string(task)
+        values.append(value)
+    raw = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def to_python(model, name, value):
+    if value is None:
+        return None
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # Annotated keys (the search rank) are floats
+        return float(value)
+    return field.to_python(value)
+
+
+def decode_cursor(cursor, keys, model):
+    """Return the sort key values in a cursor, or None if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            return None
+        return [
+            to_python(model, name, value) for (name, _), value in zip(keys, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError, ValidationError):
+        return None
+
+
+def after_cursor(keys, values, model):
+    """Filter for rows that sort after values, with NULLs last on nullable keys"""
+    condition = Q(pk__in=[])
+    equal = Q()
+    for (name, descending), value in zip(keys, values):
+        nullable = is_nullable(model, name)
+        if value is None:
+            # Only other NULLs follow a NULL, and those are equal on this key
+            later, same = Q(pk__in=[]), Q(**{f'{name}__isnull': True})
+        else:
+            later = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+            if nullable:
+                later |= Q(**{f'{name}__isnull': True})
+            same = Q(**{name: value})
+        condition |= equal & later
+        equal &= same
+    return condition
+
+
+class TaskPage:
+    """A page of tasks located by the sort key values of the previous page's last row"""
+
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def keyset_page(tasks, sort_by, after=None, per_page=TASKS_PER_PAGE):
+    """Return the page of tasks following a cursor in sort_by order.
+
+    The cursor holds the sort key values of the last task shown, so each
+    page is a range scan on the matching (user, ...) index and costs the
+    same at any depth. A malformed cursor starts from the first page.
+    """
+    keys = sort_keys(sort_by)
+    values = decode_cursor(after, keys, tasks.model) if after else None
+    if values:
+        tasks = tasks.filter(after_cursor(keys, values, tasks.model))
+    rows = list(tasks.sorted_by(sort_by)[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    return TaskPage(rows, next_cursor=encode_cursor(rows[-1], keys) if has_more else None)
@@ -0,0 +1,97 @@
+import re
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Upper
+
+# Typo-tolerant matches need this word similarity in title or description;
+# PostgreSQL's own default (0.6) rejects most single-letter typos
+FUZZY_THRESHOLD = 0.4
+
+# Relative weight of each field in the similarity rank
+FIELD_WEIGHTS = {'title': 1.0, 'description': 0.5}
+
+WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def uses_postgres():
+    return connection.vendor == 'postgresql'
+
+
+def set_trigram_threshold(sender, connection, **kwargs):
+    """Apply FUZZY_THRESHOLD to the %> operator on each new PostgreSQL connection"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET pg_trgm.word_similarity_threshold = %s', [FUZZY_THRESHOLD])
+
+
+def search_tasks(tasks, query, fuzzy=False):
+    """Filter tasks matching query and annotate each with a similarity rank.
+
+    Plain searches match substrings of title or description; fuzzy ones match
+    words similar to the query, so typos still find the task. tasks should
+    already be scoped to one user (and status), so the trigram GIN indexes
+    are combined with the (user, status) index rather than scanning every row.
+    """
+    if uses_postgres():
+        rank = sum(
+            (TrigramWordSimilarity(query, field) * Value(weight) for field, weight in FIELD_WEIGHTS.items()),
+            Value(0.0),
+        )
+        # Case-insensitive matching on UPPER(), which the trigram indexes cover
+        tasks = tasks.alias(title_upper=Upper('title'), description_upper=Upper('description'))
+        if fuzzy:
+            condition = Q(title_upper__trigram_word_similar=query) | Q(description_upper__trigram_word_similar=query)
+        else:
+            condition = Q(title_upper__contains=query.upper()) | Q(description_upper__contains=query.upper())
+        return tasks.filter(condition).annotate(rank=rank)
+
+    scores = fallback_scores(tasks, query, fuzzy)
+    return tasks.filter(id__in=scores).annotate(rank=Case(
+        *[When(id=task_id, then=Value(score)) for task_id, score in scores.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    ))
+
+
+def trigrams(text):
+    """Trigram set of text, padded per word the way pg_trgm does"""
+    result = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def word_similarity(query, text):
+    """Share of the query's trigrams found in the best run of words in text.
+
+    Approximates pg_trgm's word_similarity() by comparing the query with
+    each window of as many consecutive words as the query has.
+    """
+    query_trigrams = trigrams(query)
+    words = WORD_RE.findall((text or '').lower())
+    if not query_trigrams or not words:
+        return 0.0
+    size = min(len(WORD_RE.findall(query)) or 1, len(words))
+    best = 0.0
+    for start in range(len(words) - size + 1):
+        window = trigrams(' '.join(words[start:start + size]))
+        best = max(best, len(query_trigrams & window) / len(query_trigrams))
+    return best
+
+
+def fallback_scores(tasks, query, fuzzy=False):
+    """Return {task_id: rank} for matching tasks, computed in Python for SQLite"""
+    needle = query.lower()
+    scores = {}
+    for row in tasks.values('id', *FIELD_WEIGHTS):
+        similarities = {field: word_similarity(query, row[field]) for field in FIELD_WEIGHTS}
+        if fuzzy:
+            matched = any(similarity >= FUZZY_THRESHOLD for similarity in similarities.values())
+        else:
+            matched = any(needle in (row[field] or '').lower() for field in FIELD_WEIGHTS)
+        if matched:
+            scores[row['id']] = sum(similarities[field] * weight for field, weight in FIELD_WEIGHTS.items())
+    return scores
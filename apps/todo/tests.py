@@ -1,3 +1,248 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .forms import TaskFilterForm
+from .models import PRIORITY_RANKS, STATUS_RANKS, Task
+from .pagination import TASKS_PER_PAGE
+from .search import search_tasks
+
+# The description column selected on its own; the SUBSTR preview is fine
+DESCRIPTION_COLUMN = re.compile(r'(?<!\()"todo_task"\."description"')
+
+
+class TaskListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('worker', password='secret')
+        for number in range(3):
+            Task.objects.create(title=f'Task {number}', description='Details. ' * 2000, user=cls.user)
+
+    def test_task_list_does_not_load_descriptions(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('todo:task_list'), secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Details.')
+        for query in context.captured_queries:
+            self.assertIsNone(DESCRIPTION_COLUMN.search(query['sql']), query['sql'])
+
+
+class TaskPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planner', password='secret')
+        now = timezone.now()
+        for number in range(30):
+            Task.objects.create(
+                title=f'Task {number % 4}',
+                user=cls.user,
+                priority=Task.PRIORITY_CHOICES[number % 4][0],
+                status=Task.STATUS_CHOICES[number % 3][0],
+                due_date=None if number % 3 == 0 else now + timedelta(days=number % 5),
+            )
+
+    def test_pages_cover_every_task_in_sort_order(self):
+        self.client.force_login(self.user)
+        for sort_by, _ in TaskFilterForm.base_fields['sort_by'].choices:
+            response = self.client.get(reverse('todo:task_list'), {'sort_by': sort_by}, secure=True)
+            ids = [task.id for task in response.context['tasks']]
+            next_query = response.context['next_query']
+            while next_query:
+                response = self.client.get(f"{reverse('todo:task_list_page')}?{next_query}", secure=True)
+                ids += [task.id for task in response.context['tasks']]
+                next_query = response.context['next_query']
+            expected = list(Task.objects.filter(user=self.user).sorted_by(sort_by).values_list('id', flat=True))
+            self.assertEqual(ids, expected, sort_by)
+
+
+class TaskSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('searcher', password='secret')
+        for title in ['Team meeting notes', 'Buy groceries', 'Fix login bug']:
+            Task.objects.create(title=title, user=cls.user)
+        Task.objects.create(title='Team meeting notes', user=User.objects.create_user('other'))
+
+    def search(self, **params):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('todo:task_list'), params, secure=True)
+        return [task.title for task in response.context['tasks']]
+
+    def test_plain_search_needs_the_exact_text(self):
+        self.assertEqual(self.search(search='meeting'), ['Team meeting notes'])
+        self.assertEqual(self.search(search='meetnig'), [])
+
+    def test_relevance_pages_cover_every_match_once(self):
+        # Enough matches for several pages, with many tied ranks across page breaks
+        titles = ['Team meeting', 'Meeting room booking', 'Prepare the weekly meeting agenda', 'Notes']
+        for number in range(TASKS_PER_PAGE * 3 + 5):
+            Task.objects.create(
+                title=titles[number % 4],
+                description='Follow up after the meeting' if number % 3 == 0 else '',
+                user=self.user,
+            )
+        self.client.force_login(self.user)
+        for fuzzy in ('', 'on'):
+            with self.subTest(fuzzy=fuzzy):
+                params = {'search': 'meeting', 'fuzzy': fuzzy}
+                response = self.client.get(reverse('todo:task_list'), params, secure=True)
+                pages = [response.context['tasks']]
+                while response.context['next_query']:
+                    url = f"{reverse('todo:task_list_page')}?{response.context['next_query']}"
+                    response = self.client.get(url, secure=True)
+                    pages.append(response.context['tasks'])
+                self.assertGreater(len(pages), 2)
+
+                ids = [task.id for page in pages for task in page]
+                ranks = [task.rank for page in pages for task in page]
+                matches = search_tasks(Task.objects.filter(user=self.user), 'meeting', fuzzy=bool(fuzzy))
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(set(ids), set(matches.values_list('id', flat=True)))
+                self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+    def test_fuzzy_search_tolerates_typos(self):
+        self.assertEqual(self.search(search='meetnig', fuzzy='on'), ['Team meeting notes'])
+        self.assertEqual(self.search(search='grocerys', fuzzy='on'), ['Buy groceries'])
+
+
+class TaskBulkUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('organizer', password='secret')
+        cls.done = timezone.now() - timedelta(days=3)
+        cls.completed = Task.objects.create(
+            title='Done', user=cls.user, status='completed', completed_date=cls.done,
+        )
+        cls.open = Task.objects.create(title='Open', user=cls.user, priority='low')
+        cls.foreign = Task.objects.create(title='Not mine', user=User.objects.create_user('stranger'))
+
+    def bulk_update(self, tasks, **data):
+        self.client.force_login(self.user)
+        data['task_ids'] = [task.id for task in tasks]
+        return self.client.post(reverse('todo:task_bulk_update'), data, secure=True)
+
+    def test_completing_keeps_existing_completed_date(self):
+        self.bulk_update([self.completed, self.open], action='status', status='completed')
+        self.completed.refresh_from_db()
+        self.open.refresh_from_db()
+        self.assertEqual(self.completed.completed_date, self.done)
+        self.assertIsNotNone(self.open.completed_date)
+        self.assertGreater(self.open.completed_date, self.done)
+
+    def test_reopening_clears_completed_date(self):
+        self.bulk_update([self.completed], action='status', status='in_progress')
+        self.completed.refresh_from_db()
+        self.assertEqual(self.completed.status, 'in_progress')
+        self.assertIsNone(self.completed.completed_date)
+
+    def test_ranks_follow_status_and_priority(self):
+        self.bulk_update([self.completed, self.open], action='status', status='todo')
+        self.bulk_update([self.completed, self.open], action='priority', priority='urgent')
+        for task in Task.objects.filter(user=self.user):
+            self.assertEqual(task.status_rank, STATUS_RANKS[task.status])
+            self.assertEqual(task.priority_rank, PRIORITY_RANKS[task.priority])
+            self.assertEqual((task.status, task.priority), ('todo', 'urgent'))
+
+    def test_other_users_tasks_are_ignored(self):
+        self.bulk_update([self.open, self.foreign], action='status', status='completed')
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'todo')
+        self.assertIsNone(self.foreign.completed_date)
+        self.bulk_update([self.foreign], action='delete')
+        self.assertTrue(Task.objects.filter(id=self.foreign.id).exists())
+
+    def test_next_redirect_stays_on_site(self):
+        next_url = f"{reverse('todo:task_list')}?sort_by=title"
+        response = self.bulk_update([self.open], action='priority', priority='high', next=next_url)
+        self.assertRedirects(response, next_url, fetch_redirect_response=False)
+        for next_url in ['https://evil.example/', '//evil.example/tasks/']:
+            response = self.bulk_update([self.open], action='priority', priority='high', next=next_url)
+            self.assertRedirects(response, reverse('todo:task_list'), fetch_redirect_response=False)
+
+
+class TaskStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('counter', password='secret')
+        now = timezone.now()
+        due_dates = [None, now - timedelta(days=2), now + timedelta(hours=3), now + timedelta(days=4)]
+        for number in range(12):
+            Task.objects.create(
+                title=f'Task {number}',
+                user=cls.user,
+                priority=Task.PRIORITY_CHOICES[number % 4][0],
+                status=Task.STATUS_CHOICES[number % 3][0],
+                due_date=due_dates[number % 4],
+            )
+        Task.objects.create(title='Elsewhere', user=User.objects.create_user('bystander'), status='completed')
+
+    def test_stats_match_per_task_counts(self):
+        tasks = list(Task.objects.filter(user=self.user))
+        with self.assertNumQueries(1):
+            stats = Task.objects.filter(user=self.user).stats()
+        self.assertEqual(stats['total'], len(tasks))
+        self.assertEqual(stats['completed'], sum(task.status == 'completed' for task in tasks))
+        self.assertEqual(stats['pending'], sum(task.status != 'completed' for task in tasks))
+        self.assertEqual(stats['overdue'], sum(task.is_overdue for task in tasks))
+        for key, _ in Task.PRIORITY_CHOICES:
+            self.assertEqual(stats[f'priority_{key}'], sum(task.priority == key for task in tasks), key)
+        for key, _ in Task.STATUS_CHOICES:
+            self.assertEqual(stats[f'status_{key}'], sum(task.status == key for task in tasks), key)
+
+    def test_due_flags_match_task_properties(self):
+        for task in Task.objects.filter(user=self.user).with_due_flags():
+            self.assertEqual(task.overdue, task.is_overdue, task.title)
+            self.assertEqual(task.due_soon, task.is_due_soon, task.title)
+
+
+class TaskRankOrderingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('ranker', password='secret')
+        now = timezone.now()
+        for number in range(12):
+            Task.objects.create(
+                title=f'Task {(number * 7) % 5}',
+                user=cls.user,
+                priority=Task.PRIORITY_CHOICES[(number * 5) % 4][0],
+                status=Task.STATUS_CHOICES[number % 3][0],
+                due_date=None if number % 4 == 0 else now + timedelta(days=number % 3),
+            )
+
+    def python_order(self, sort_by, tasks):
+        now = timezone.now()
+
+        def due(task):
+            # Tasks without a due date go last
+            return (task.due_date is None, task.due_date or now)
+
+        if sort_by == 'due_date':
+            key = lambda task: (due(task), task.id)
+        elif sort_by == 'priority':
+            key = lambda task: (STATUS_RANKS[task.status], PRIORITY_RANKS[task.priority], due(task), task.id)
+        elif sort_by == 'title':
+            key = lambda task: (task.title, task.id)
+        else:
+            return [task.id for task in sorted(tasks, key=lambda task: (task.created_date, task.id), reverse=True)]
+        return [task.id for task in sorted(tasks, key=key)]
+
+    def test_stored_ranks_give_each_sort_order(self):
+        tasks = list(Task.objects.filter(user=self.user))
+        for sort_by, _ in TaskFilterForm.base_fields['sort_by'].choices:
+            with self.subTest(sort_by=sort_by):
+                ordered = list(Task.objects.filter(user=self.user).sorted_by(sort_by).values_list('id', flat=True))
+                self.assertEqual(ordered, self.python_order(sort_by, tasks))
 
-# Create your tests here.
+    def test_ranks_follow_single_task_saves(self):
+        task = Task.objects.filter(user=self.user).first()
+        task.status, task.priority = 'in_progress', 'urgent'
+        task.save(update_fields=['status', 'priority'])
+        task.refresh_from_db()
+        self.assertEqual((task.status_rank, task.priority_rank), (STATUS_RANKS['in_progress'], PRIORITY_RANKS['urgent']))
@@ -5,6 +5,7 @@ app_name = 'todo'
 
 urlpatterns = [
     path('', views.task_list, name='task_list'),
+    path('tasks/page/', views.task_list_page, name='task_list_page'),
     path('task/new/', views.task_create, name='task_create'),
     path('task/<int:pk>/', views.task_detail, name='task_detail'),
     path('task/<int:pk>/edit/', views.task_update, name='task_update'),
@@ -12,4 +13,5 @@ urlpatterns = [
     path('task/<int:pk>/toggle/', views.task_toggle_complete, name='task_toggle_complete'),
     path('task/<int:pk>/status/', views.task_update_status, name='task_update_status'),
     path('tasks/bulk-delete/', views.task_bulk_delete, name='task_bulk_delete'),
+    path('tasks/bulk/', views.task_bulk_update, name='task_bulk_update'),
 ]
\ No newline at end of file
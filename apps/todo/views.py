@@ -1,15 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Case, When, IntegerField
 from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
 from .models import Task
-from .forms import TaskForm, TaskFilterForm
+from .forms import TaskForm, TaskFilterForm, TaskBulkForm
+from .pagination import keyset_page
+from .search import search_tasks
 
-@login_required
-def task_list(request):
-    """Display list of user's tasks with filtering and sorting"""
-    tasks = Task.objects.filter(user=request.user)
+def filtered_tasks(request):
+    """The user's task cards matching the filter form, and the requested sort"""
+    tasks = Task.objects.cards().filter(user=request.user)
     
     # Apply filters
     filter_form = TaskFilterForm(request.GET)
@@ -19,64 +20,79 @@ def task_list(request):
         priority = filter_form.cleaned_data.get('priority')
         sort_by = filter_form.cleaned_data.get('sort_by')
         
-        if search:
-            tasks = tasks.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search)
-            )
-        
         if status:
             tasks = tasks.filter(status=status)
         
         if priority:
             tasks = tasks.filter(priority=priority)
         
-        # Sorting
-        if sort_by == 'due_date':
-            # Sort by due date, with tasks without due dates last
-            tasks = tasks.order_by(
-                Case(
-                    When(due_date__isnull=True, then=1),
-                    default=0,
-                    output_field=IntegerField(),
-                ),
-                'due_date'
-            )
-        elif sort_by == 'priority':
-            # Custom priority order: urgent, high, medium, low
-            tasks = tasks.order_by(
-                Case(
-                    When(priority='urgent', then=0),
-                    When(priority='high', then=1),
-                    When(priority='medium', then=2),
-                    When(priority='low', then=3),
-                    output_field=IntegerField(),
-                )
-            )
-        elif sort_by == 'title':
-            tasks = tasks.order_by('title')
-    # AFTER filters + sorting logic
-    tasks = tasks.order_by('priority', 'status')
-    
-    # Get statistics
-    total_tasks = Task.objects.filter(user=request.user).count()
-    completed_tasks = Task.objects.filter(user=request.user, status='completed').count()
-    pending_tasks = Task.objects.filter(user=request.user).exclude(status='completed').count()
-    overdue_tasks = sum(1 for task in tasks if task.is_overdue)
-    tasks = tasks.order_by('priority', 'status')
+        # Trigram search within the user's (and status's) tasks, best match first
+        if search:
+            tasks = search_tasks(tasks, search, fuzzy=filter_form.cleaned_data.get('fuzzy'))
+            sort_by = sort_by or 'relevance'
+        
+    else:
+        sort_by = ''
+    
+    return tasks, filter_form, sort_by
+
 
+def task_page(request, tasks, sort_by, now):
+    """The page of tasks after ?after=, with overdue / due-soon flags from SQL"""
+    return keyset_page(tasks.with_due_flags(now), sort_by, after=request.GET.get('after'))
+
+
+def next_page_query(request, page):
+    """Current filters and sort with the cursor of the next page"""
+    query = request.GET.copy()
+    query['after'] = page.next_cursor
+    return query.urlencode()
+
+
+@login_required
+def task_list(request):
+    """Display list of user's tasks with filtering and sorting, one page at a time"""
+    tasks, filter_form, sort_by = filtered_tasks(request)
+    
+    # Statistics over all of the user's tasks, in one conditional aggregate
+    now = timezone.now()
+    stats = Task.objects.filter(user=request.user).stats(now)
+    page = task_page(request, tasks, sort_by, now)
     
     context = {
-        'tasks': tasks,
+        'tasks': page,
+        'next_query': next_page_query(request, page) if page.has_next() else '',
         'filter_form': filter_form,
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'pending_tasks': pending_tasks,
-        'overdue_tasks': overdue_tasks,
+        'bulk_form': TaskBulkForm(),
+        'total_tasks': stats['total'],
+        'completed_tasks': stats['completed'],
+        'pending_tasks': stats['pending'],
+        'overdue_tasks': stats['overdue'],
+        'priority_counts': [
+            (label, Task.PRIORITY_CLASSES[key], stats[f'priority_{key}'])
+            for key, label in Task.PRIORITY_CHOICES
+        ],
+        'status_counts': [
+            (label, Task.STATUS_CLASSES[key], stats[f'status_{key}'])
+            for key, label in Task.STATUS_CHOICES
+        ],
     }
     return render(request, 'todo/task_list.html', context)
 
 
+@login_required
+def task_list_page(request):
+    """Render the next page of task cards as an HTML fragment for infinite scroll"""
+    tasks, filter_form, sort_by = filtered_tasks(request)
+    page = task_page(request, tasks, sort_by, timezone.now())
+    
+    context = {
+        'tasks': page,
+        'next_query': next_page_query(request, page) if page.has_next() else '',
+    }
+    return render(request, 'todo/includes/task_page.html', context)
+
+
 @login_required
 def task_detail(request, pk):
     """Display single task details"""
@@ -195,4 +211,40 @@ def task_bulk_delete(request):
         
         messages.success(request, f'Deleted {deleted_count} completed task(s)!')
     
-    return redirect('todo:task_list')
\ No newline at end of file
+    return redirect('todo:task_list')
+
+
+def apply_bulk_action(tasks, action, data):
+    """Apply a TaskBulkForm action to tasks as one UPDATE or DELETE; returns the row count"""
+    if action == 'delete':
+        return tasks.delete()[0]
+    if action == 'status':
+        return tasks.set_status(data['status'])
+    if action == 'priority':
+        return tasks.set_priority(data['priority'])
+    return tasks.set_due_date(data['due_date'])
+
+
+@login_required
+def task_bulk_update(request):
+    """Change status, priority or due date of, or delete, the selected tasks"""
+    if request.method == 'POST':
+        form = TaskBulkForm(request.POST)
+        if form.is_valid():
+            action = form.cleaned_data['action']
+            tasks = Task.objects.filter(user=request.user, id__in=form.cleaned_data['task_ids'])
+            count = apply_bulk_action(tasks, action, form.cleaned_data)
+            if action == 'delete':
+                messages.success(request, f'Deleted {count} task(s)!')
+            else:
+                messages.success(request, f'Updated {count} task(s)!')
+        else:
+            errors = [error for field_errors in form.errors.values() for error in field_errors]
+            messages.error(request, errors[0])
+    
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(
+        next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()
+    ):
+        return redirect(next_url)
+    return redirect('todo:task_list')
@@ -0,0 +1,164 @@
+import io
+import logging
+import multiprocessing
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Widths (in pixels) of the derivatives generated for every uploaded image
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+# Threads that feed the process pool and store results; bounds concurrent uploads
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-variants')
+
+
+def resize_variants(data, widths=VARIANT_WIDTHS):
+    """Return (source width, {(format, width): encoded bytes}) for an image.
+
+    Runs in a worker process, so it only depends on Pillow. Widths larger than
+    the source are skipped; the source width itself is always included so the
+    largest candidate is never upscaled or missing.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        source_width = image.width
+        targets = sorted({width for width in widths if width < source_width} | {source_width})
+        encoded = {}
+        for width in targets:
+            height = round(image.height * width / source_width)
+            resized = image if width == source_width else image.resize((width, height), Image.LANCZOS)
+            for key, (pil_format, _, options) in VARIANT_FORMATS.items():
+                buffer = io.BytesIO()
+                resized.save(buffer, pil_format, **options)
+                encoded[(key, width)] = buffer.getvalue()
+    return source_width, encoded
+
+
+def get_pool():
+    """Process pool for resizing, created lazily in each (forked) worker"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=2,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def variant_name(name, width, extension):
+    """blog/images/a.png -> blog/images/variants/a-640w.webp"""
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'variants', f'{stem}-{width}w.{extension}')
+
+
+def build_variants(field_file):
+    """Generate and store the derivatives of an image, returning their record"""
+    from django.core.files.base import ContentFile
+
+    storage = field_file.storage
+    with storage.open(field_file.name) as source:
+        data = source.read()
+    source_width, encoded = get_pool().submit(resize_variants, data).result()
+
+    variants = {'source': field_file.name, 'width': source_width}
+    for (key, width), content in encoded.items():
+        extension = VARIANT_FORMATS[key][1]
+        name = variant_name(field_file.name, width, extension)
+        variants.setdefault(key, {})[str(width)] = save_variant(storage, name, ContentFile(content))
+    return variants
+
+
+def save_variant(storage, name, content):
+    """Write a derivative under its fixed name, replacing an earlier copy"""
+    if hasattr(storage, 'overwrite'):
+        return storage.overwrite(name, content)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def variant_names(variants):
+    """Stored names of every derivative in a variants record"""
+    return {
+        name
+        for key in VARIANT_FORMATS
+        for name in (variants or {}).get(key, {}).values()
+    }
+
+
+def store_variants(instance, variants_field, variants):
+    """Save a variants record with a single UPDATE that leaves updated_date alone"""
+    type(instance).objects.filter(pk=instance.pk).update(**{variants_field: variants})
+    setattr(instance, variants_field, variants)
+
+
+def update_variants(instance, image_field, variants_field):
+    """Regenerate an instance's derivatives, store them and delete replaced ones"""
+    field_file = getattr(instance, image_field)
+    previous = getattr(instance, variants_field) or {}
+    variants = build_variants(field_file) if field_file else {}
+    store_variants(instance, variants_field, variants)
+    delete_variants(instance, image_field, variant_names(previous) - variant_names(variants))
+    return variants
+
+
+def delete_variants(instance, image_field, names):
+    storage = instance._meta.get_field(image_field).storage
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            logger.exception('Could not delete image variant %s', name)
+
+
+def schedule_variants(instance, image_field, variants_field):
+    """Build derivatives off the request path once the image has changed"""
+    from django.db import close_old_connections, connection, transaction
+
+    field_file = getattr(instance, image_field)
+    variants = getattr(instance, variants_field) or {}
+    if not field_file:
+        if variants:
+            store_variants(instance, variants_field, {})
+            delete_variants(instance, image_field, variant_names(variants))
+        return
+    if variants.get('source') == field_file.name:
+        return
+
+    def run():
+        close_old_connections()
+        try:
+            update_variants(instance, image_field, variants_field)
+        except Exception:
+            logger.exception('Could not build image variants for %s', field_file.name)
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: _executor.submit(run))
+
+
+def write_static_variants(path):
+    """Write derivatives of a file under a static directory next to it"""
+    from pathlib import Path
+
+    path = Path(path)
+    _, encoded = resize_variants(path.read_bytes())
+    written = []
+    for (key, width), content in encoded.items():
+        target = path.parent / variant_name(path.name, width, VARIANT_FORMATS[key][1])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        written.append(target)
+    return written
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 from supabase import create_client
 from decouple import config
 import dj_database_url
@@ -10,7 +11,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # Security settings
 SECRET_KEY = config('SECRET_KEY', default='django-insecure-change-this-in-production')
 DEBUG = config('DEBUG', default=False, cast=bool)
+TESTING = sys.argv[1:2] == ['test']
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='my-portfolio-v3uy.onrender.com').split(',')
+# Public base URL for absolute links built outside a request's host (e.g. cached API payloads)
+SITE_URL = config('SITE_URL', default=f'https://{ALLOWED_HOSTS[0]}')
 
 # Application definition
 INSTALLED_APPS = [
@@ -20,6 +24,8 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
+    'django.contrib.sitemaps',
     
     # Third-party apps
     'crispy_forms',
@@ -88,11 +94,39 @@ else:
     }
 
 # Caching configuration (Redis)
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+# Shared counters (e.g. buffered post views) need Redis when running several workers
+if config('REDIS_URL', default=None):
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": config('REDIS_URL'),
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+        }
     }
-}
+else:
+    # Per-process cache: each worker flushes its own buffered views and reader
+    # sketches, and flush_post_views / persist_post_readers refuse to run since
+    # they could not see them
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds between background flushes of buffered post views
+BLOG_VIEW_FLUSH_INTERVAL = config('BLOG_VIEW_FLUSH_INTERVAL', default=30, cast=int)
+# Seconds between writes of the unique-reader sketches to the database
+BLOG_READERS_PERSIST_INTERVAL = config('BLOG_READERS_PERSIST_INTERVAL', default=300, cast=int)
+
+# Seconds between database writes of a post's autosaved draft
+BLOG_AUTOSAVE_INTERVAL = config('BLOG_AUTOSAVE_INTERVAL', default=30, cast=int)
+
+# Trending posts: half-life of a view's weight and days of view history kept
+# (older day buckets are pruned by each process's first view flush of the day)
+BLOG_TRENDING_HALF_LIFE_DAYS = config('BLOG_TRENDING_HALF_LIFE_DAYS', default=3, cast=float)
+BLOG_TRENDING_WINDOW_DAYS = config('BLOG_TRENDING_WINDOW_DAYS', default=30, cast=int)
 
 
 # Session cache
@@ -129,12 +163,25 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media files
 #MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploaded media goes to the Supabase "media" bucket in the background
+SUPABASE_MEDIA_BUCKET = 'media'
+# Set to a directory to use a filesystem stand-in for the bucket (tests, offline dev)
+SUPABASE_STORAGE_LOCAL_ROOT = config('SUPABASE_STORAGE_LOCAL_ROOT', default=None)
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'my_portfolio.storage.SupabaseStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
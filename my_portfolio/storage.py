@@ -0,0 +1,140 @@
+import logging
+import mimetypes
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.core.files.utils import validate_file_name
+from django.utils.deconstruct import deconstructible
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+logger = logging.getLogger(__name__)
+
+# Uploads run on a small pool shared by every storage instance in the worker
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='media-upload')
+
+
+class LocalBucket:
+    """Filesystem stand-in for a Supabase storage bucket, for tests and development"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, name):
+        return self.root / name
+
+    def upload(self, path, file, file_options=None):
+        target = self._path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'wb') as destination:
+            shutil.copyfileobj(file, destination)
+
+    def download(self, path):
+        return self._path(path).read_bytes()
+
+    def remove(self, paths):
+        for path in paths:
+            self._path(path).unlink(missing_ok=True)
+
+    def exists(self, path):
+        return self._path(path).exists()
+
+    def info(self, path):
+        return {'size': self._path(path).stat().st_size}
+
+
+@deconstructible
+class SupabaseStorage(Storage):
+    """Django storage backed by a Supabase bucket, uploading off the request path.
+
+    Saved files are streamed in chunks to a local staging directory and the
+    request returns immediately; a background thread then streams the staged
+    file to the bucket with retries. Until the upload finishes, the staged copy
+    answers exists(), open() and size().
+    """
+
+    def __init__(self, bucket_name=None, staging_root=None, bucket=None):
+        self.bucket_name = bucket_name or getattr(settings, 'SUPABASE_MEDIA_BUCKET', 'media')
+        self.staging_root = Path(staging_root or Path(settings.MEDIA_ROOT) / '.upload-queue')
+        self._bucket = bucket
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            local_root = getattr(settings, 'SUPABASE_STORAGE_LOCAL_ROOT', None)
+            if local_root:
+                self._bucket = LocalBucket(local_root)
+            else:
+                from my_portfolio.settings import supabase
+                self._bucket = supabase.storage.from_(self.bucket_name)
+        return self._bucket
+
+    def _staged_path(self, name):
+        return self.staging_root / name
+
+    def _save(self, name, content):
+        staged = self._staged_path(name)
+        staged.parent.mkdir(parents=True, exist_ok=True)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with open(staged, 'wb') as destination:
+            for chunk in content.chunks():
+                destination.write(chunk)
+
+        _executor.submit(self._upload_in_background, name)
+        return name
+
+    def overwrite(self, name, content):
+        """Save content under exactly name; the bucket upload upserts, so no exists() check"""
+        validate_file_name(name, allow_relative_path=True)
+        return self._save(name, content)
+
+    def _upload_in_background(self, name):
+        try:
+            self.upload_staged(name)
+        except Exception:
+            logger.exception('Upload of %s to bucket %s failed; staged copy kept', name, self.bucket_name)
+
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, max=30), reraise=True)
+    def upload_staged(self, name):
+        """Stream a staged file to the bucket, then remove the staged copy"""
+        staged = self._staged_path(name)
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        with open(staged, 'rb') as source:
+            self.bucket.upload(name, source, {'content-type': content_type, 'upsert': 'true'})
+        staged.unlink(missing_ok=True)
+
+    def staged_names(self):
+        """Names of staged files, including ones left by a failed or interrupted upload"""
+        if not self.staging_root.exists():
+            return []
+        return sorted(
+            path.relative_to(self.staging_root).as_posix()
+            for path in self.staging_root.rglob('*') if path.is_file()
+        )
+
+    def _open(self, name, mode='rb'):
+        staged = self._staged_path(name)
+        if staged.exists():
+            return ContentFile(staged.read_bytes(), name=name)
+        return ContentFile(self.bucket.download(name), name=name)
+
+    def exists(self, name):
+        return self._staged_path(name).exists() or self.bucket.exists(name)
+
+    def delete(self, name):
+        self._staged_path(name).unlink(missing_ok=True)
+        self.bucket.remove([name])
+
+    def size(self, name):
+        staged = self._staged_path(name)
+        if staged.exists():
+            return staged.stat().st_size
+        return int(self.bucket.info(name).get('size', 0))
+
+    def url(self, name):
+        return f'{settings.MEDIA_URL}{name}'
+
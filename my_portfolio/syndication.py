@@ -0,0 +1,91 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+DOCUMENT_KEY = 'syndication:{}'
+VERSION_KEY = 'syndication:version:{}'
+# Documents are keyed on their content version, so the timeout only bounds memory
+DOCUMENT_TIMEOUT = 60 * 60 * 24
+MAX_AGE = 60 * 5
+
+
+def generation(key):
+    """Counter stored at key, bumped by bump_generation when its content changes"""
+    value = cache.get(key)
+    if value is None:
+        # Start from the clock so an evicted counter never reuses an old value
+        cache.add(key, time.time_ns(), None)
+        value = cache.get(key)
+    return value
+
+
+def bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def content_version(*keys):
+    """Return (last modified, digest) for the current generations at keys.
+
+    Costs cache reads only: last modified is when the current combination of
+    generations was first served, which is never before the change that bumped it.
+    """
+    digest = hashlib.md5('|'.join(str(generation(key)) for key in keys).encode()).hexdigest()
+    version_key = VERSION_KEY.format(digest)
+    cache.add(version_key, timezone.now(), DOCUMENT_TIMEOUT)
+    return cache.get(version_key), digest
+
+
+def document_key(request, params, digest):
+    """Cache key from the host, path and only the query parameters the view reads"""
+    query = [(name, request.GET.getlist(name)) for name in sorted(params) if name in request.GET]
+    raw = f'{request.get_host()}{request.path}?{query!r}'
+    return DOCUMENT_KEY.format(f'{hashlib.md5(raw.encode()).hexdigest()}:{digest}')
+
+
+def cached_document(version_func, timeout=DOCUMENT_TIMEOUT, params=()):
+    """Serve a generated document from the cache, regenerating it on a new version.
+
+    version_func(request, *args, **kwargs) returns (last_modified, digest);
+    last_modified may be None. It should raise Http404 for a missing object,
+    as it runs before the view. params names the query parameters the view
+    reads; others do not get their own cache entries.
+    Requests whose If-None-Match or If-Modified-Since still match get a 304
+    without the document being rendered or read from the cache.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            last_modified, digest = version_func(request, *args, **kwargs)
+            etag = f'"{digest}"'
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                key = document_key(request, params, digest)
+                cached = cache.get(key)
+                if cached is not None:
+                    content, content_type = cached
+                    response = HttpResponse(content, content_type=content_type)
+                else:
+                    response = view(request, *args, **kwargs)
+                    if hasattr(response, 'render'):
+                        response.render()
+                    if response.status_code == 200:
+                        cache.set(key, (response.content, response['Content-Type']), timeout)
+
+            response['ETag'] = etag
+            if timestamp:
+                response['Last-Modified'] = http_date(timestamp)
+            response['Cache-Control'] = f'public, max-age={MAX_AGE}'
+            return response
+        return wrapper
+    return decorator
@@ -3,10 +3,28 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
+from django.contrib.sitemaps.views import sitemap
+from apps.blog.api import GENERATION_KEY
+from apps.blog.sitemaps import PostSitemap, CategorySitemap
 from apps.portfolio_site.forms import EmailAuthenticationForm
+from apps.portfolio_site.sitemaps import PROJECTS_KEY, ProjectSitemap, StaticViewSitemap
+from my_portfolio.syndication import cached_document, content_version
+
+sitemaps = {
+    'static': StaticViewSitemap,
+    'posts': PostSitemap,
+    'categories': CategorySitemap,
+    'projects': ProjectSitemap,
+}
+
+
+def sitemap_version(request, *args, **kwargs):
+    return content_version(GENERATION_KEY, PROJECTS_KEY)
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('sitemap.xml', cached_document(sitemap_version, params=['p'])(sitemap), {'sitemaps': sitemaps}, name='sitemap'),
     
     # Authentication URLs
     path('login/', auth_views.LoginView.as_view(